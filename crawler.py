@@ -16,7 +16,8 @@ import json
 import sqlite3
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from queue import Queue, Empty
+from queue import Queue, Empty, Full
+from contextlib import contextmanager
 from urllib.parse import urljoin, urlparse, urlunparse
 from urllib.robotparser import RobotFileParser
 from collections import deque
@@ -28,12 +29,19 @@ from tqdm import tqdm
 from datetime import datetime
 import fnmatch
 
+from url_utils import extract_domain
+
 # Import DataExporter for export functionality
 try:
     from data_exporter import DataExporter
 except ImportError:
     DataExporter = None
 
+# Use orjson for faster JSON serialization when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 class ContentExtractor:
     """
@@ -502,14 +510,84 @@ class DatabaseManager:
     Simplified database manager for storing crawled data.
     """
     
-    def __init__(self, db_path: str = "crawler_database.db"):
-        """Initialize database manager."""
+    # Buffered page/error rows written per transaction
+    WRITE_BATCH_SIZE = 500
+    # Buffered rows are also written once they are this many seconds old,
+    # so readers such as the web UI see a slow crawl's pages promptly
+    FLUSH_INTERVAL = 1.0
+    
+    # Per-connection tuning (WAL itself is persistent and set in init_database)
+    CONNECTION_PRAGMAS = (
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-65536",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA cache_spill=0",
+    )
+    
+    # Hot-path statements, kept as constants so every call reuses the same
+    # entry in the connection's prepared-statement cache
+    _SQL_INSERT_PAGE = """
+        INSERT INTO pages (
+            url, title, status_code, content_type, content_length,
+            response_time, timestamp, extracted_data, session_id, domain,
+            content_text
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(url) DO UPDATE SET
+            title = excluded.title,
+            status_code = excluded.status_code,
+            content_type = excluded.content_type,
+            content_length = excluded.content_length,
+            response_time = excluded.response_time,
+            timestamp = excluded.timestamp,
+            extracted_data = excluded.extracted_data,
+            session_id = excluded.session_id,
+            domain = excluded.domain,
+            content_text = excluded.content_text
+    """
+    _SQL_INSERT_ERROR = """
+        INSERT INTO errors (session_id, url, error_type, error_message, timestamp)
+        VALUES (?, ?, ?, ?, ?)
+    """
+    _SQL_UPDATE_SESSION = """
+        UPDATE crawl_sessions SET 
+            pages_crawled = ?, 
+            total_errors = ?,
+            completed_at = ?,
+            status = 'completed'
+        WHERE id = ?
+    """
+    
+    def __init__(self, db_path: str = "crawler_database.db", batch_size: int = None):
+        """Initialize database manager.
+        
+        batch_size overrides WRITE_BATCH_SIZE, the number of buffered rows
+        written per transaction.
+        """
         self.db_path = db_path
+        self.batch_size = batch_size or self.WRITE_BATCH_SIZE
         self.init_database()
+        
+        # One shared write connection plus a small pool of read connections
+        self._write_lock = threading.Lock()
+        self._write_conn = self.get_connection(check_same_thread=False)
+        self._read_pool: Queue = Queue(maxsize=os.cpu_count() or 4)
+        
+        # Page/error rows waiting to be written in one transaction
+        self._buffer_lock = threading.Lock()
+        self._page_buffer: List[tuple] = []
+        self._error_buffer: List[tuple] = []
+        self._last_flush = time.monotonic()
     
     def init_database(self):
         """Initialize database schema and handle migrations."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.get_connection() as conn:
+            # Larger pages suit the big HTML rows; only takes effect on a new file,
+            # so it has to run before WAL is enabled
+            conn.execute("PRAGMA page_size=8192")
+            # WAL lets readers proceed while crawler workers write
+            conn.execute("PRAGMA journal_mode=WAL")
             cursor = conn.cursor()
             
             # Create crawl_sessions table with new schema
@@ -551,10 +629,32 @@ class DatabaseManager:
                     content_length INTEGER,
                     response_time REAL,
                     timestamp REAL,
-                    extracted_data TEXT
+                    extracted_data TEXT,
+                    session_id INTEGER,
+                    domain TEXT,
+                    content_text TEXT
                 )
             """)
             
+            # Older databases lack the pages.session_id / domain / content_text columns
+            for column, column_type in (('session_id', 'INTEGER'), ('domain', 'TEXT'),
+                                        ('content_text', 'TEXT')):
+                try:
+                    cursor.execute(f"SELECT {column} FROM pages LIMIT 1")
+                except sqlite3.OperationalError:
+                    print(f"[DATABASE] Migrating database schema - adding pages.{column}...")
+                    cursor.execute(f"ALTER TABLE pages ADD COLUMN {column} {column_type}")
+                    if column == 'content_text':
+                        # Materialize the text once so searches don't parse JSON per row
+                        cursor.execute("""
+                            UPDATE pages SET content_text = json_extract(extracted_data, '$.text_content')
+                            WHERE extracted_data IS NOT NULL
+                        """)
+            
+            # Backfill domains for rows saved before the column existed
+            conn.create_function("extract_domain", 1, extract_domain, deterministic=True)
+            cursor.execute("UPDATE pages SET domain = extract_domain(url) WHERE domain IS NULL")
+            
             # Create errors table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS errors (
@@ -580,87 +680,267 @@ class DatabaseManager:
                 )
             """)
             
+            # Keep session counters current while a crawl runs so the dashboard's
+            # recent-crawls list reads them directly; end_session writes the
+            # crawler's final totals over them
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS session_pages_ai AFTER INSERT ON pages
+                WHEN NEW.session_id IS NOT NULL BEGIN
+                    UPDATE crawl_sessions SET pages_crawled = COALESCE(pages_crawled, 0) + 1
+                    WHERE id = NEW.session_id;
+                END
+            """)
+            # Saving a URL that is already stored is an upsert, which fires
+            # UPDATE triggers only; move the page to its new session's count
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS session_pages_au AFTER UPDATE OF session_id ON pages
+                WHEN OLD.session_id IS NOT NEW.session_id BEGIN
+                    UPDATE crawl_sessions SET pages_crawled = COALESCE(pages_crawled, 0) - 1
+                    WHERE id = OLD.session_id;
+                    UPDATE crawl_sessions SET pages_crawled = COALESCE(pages_crawled, 0) + 1
+                    WHERE id = NEW.session_id;
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS session_errors_ai AFTER INSERT ON errors
+                WHEN NEW.session_id IS NOT NULL BEGIN
+                    UPDATE crawl_sessions SET total_errors = COALESCE(total_errors, 0) + 1
+                    WHERE id = NEW.session_id;
+                END
+            """)
+            
+            # Per-domain page counts for the web UI's domain filter, so the
+            # dropdown reads a few rows instead of walking every page
+            has_domain_counts = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pages_domains'"
+            ).fetchone()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS pages_domains (
+                    domain TEXT PRIMARY KEY,
+                    cnt INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            if not has_domain_counts:
+                cursor.execute("""
+                    INSERT INTO pages_domains (domain, cnt)
+                    SELECT domain, COUNT(*) FROM pages
+                    WHERE domain IS NOT NULL AND domain != ''
+                    GROUP BY domain
+                """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS pages_domains_ai AFTER INSERT ON pages
+                WHEN NEW.domain IS NOT NULL AND NEW.domain != '' BEGIN
+                    INSERT INTO pages_domains (domain, cnt) VALUES (NEW.domain, 1)
+                    ON CONFLICT(domain) DO UPDATE SET cnt = cnt + 1;
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS pages_domains_ad AFTER DELETE ON pages
+                WHEN OLD.domain IS NOT NULL AND OLD.domain != '' BEGIN
+                    UPDATE pages_domains SET cnt = cnt - 1 WHERE domain = OLD.domain;
+                    DELETE FROM pages_domains WHERE domain = OLD.domain AND cnt <= 0;
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS pages_domains_au AFTER UPDATE OF domain ON pages
+                WHEN OLD.domain IS NOT NEW.domain BEGIN
+                    UPDATE pages_domains SET cnt = cnt - 1
+                    WHERE domain = OLD.domain AND OLD.domain != '';
+                    DELETE FROM pages_domains WHERE domain = OLD.domain AND cnt <= 0;
+                    INSERT INTO pages_domains (domain, cnt)
+                    SELECT NEW.domain, 1 WHERE NEW.domain IS NOT NULL AND NEW.domain != ''
+                    ON CONFLICT(domain) DO UPDATE SET cnt = cnt + 1;
+                END
+            """)
+            
+            # Indexes for per-session page/error lookups ordered by time
+            # (pages.url is UNIQUE, so it already has an index)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_pages_session_ts ON pages(session_id, timestamp DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_errors_session_ts ON errors(session_id, timestamp DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_pages_domain ON pages(session_id, domain)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_pages_domain_ts ON pages(domain, timestamp DESC)")
+            
             conn.commit()
     
-    def get_connection(self):
-        """Get database connection context manager."""
-        return sqlite3.connect(self.db_path)
+    def get_connection(self, check_same_thread: bool = True):
+        """Open a new tuned database connection."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=check_same_thread)
+        for pragma in self.CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    @contextmanager
+    def get_write(self):
+        """Use the shared write connection; commits on success, rolls back on error."""
+        with self._write_lock:
+            with self._write_conn:
+                yield self._write_conn
+    
+    @contextmanager
+    def get_read(self):
+        """Check a read connection out of the pool, opening one if none are idle."""
+        try:
+            conn = self._read_pool.get_nowait()
+        except Empty:
+            conn = self.get_connection(check_same_thread=False)
+        try:
+            yield conn
+        finally:
+            try:
+                self._read_pool.put_nowait(conn)
+            except Full:
+                conn.close()
+    
+    def flush(self):
+        """Write all buffered page and error rows in a single transaction.
+        
+        Rows leave the buffers only once their transaction has committed.
+        If the batch is rejected, its rows are retried one at a time so a
+        single bad row is logged and dropped while the rest commit; errors
+        from the database itself (locked, I/O) keep the batch buffered.
+        """
+        # Holding the write lock keeps batches in order; saves may keep
+        # appending to the buffers while the batch is written
+        with self._write_lock:
+            with self._buffer_lock:
+                pages = self._page_buffer[:]
+                errors = self._error_buffer[:]
+                self._last_flush = time.monotonic()
+            if not pages and not errors:
+                return
+            try:
+                with self._write_conn as conn:
+                    if pages:
+                        conn.executemany(self._SQL_INSERT_PAGE, pages)
+                    if errors:
+                        conn.executemany(self._SQL_INSERT_ERROR, errors)
+            except sqlite3.OperationalError as e:
+                logging.getLogger(__name__).error(
+                    f"Failed to write {len(pages)} pages and {len(errors)} errors, "
+                    f"keeping them buffered: {e}")
+                raise
+            except (sqlite3.Error, ValueError):
+                with self._write_conn as conn:
+                    self._write_rows_singly(conn, self._SQL_INSERT_PAGE, pages)
+                    self._write_rows_singly(conn, self._SQL_INSERT_ERROR, errors)
+            with self._buffer_lock:
+                del self._page_buffer[:len(pages)]
+                del self._error_buffer[:len(errors)]
+    
+    @staticmethod
+    def _write_rows_singly(conn, sql: str, rows: List[tuple]):
+        """Write rows one by one, logging and skipping any the database rejects."""
+        for row in rows:
+            try:
+                conn.execute(sql, row)
+            except sqlite3.OperationalError:
+                raise
+            except (sqlite3.Error, ValueError) as e:
+                # Rows start with the URL (pages) or session id then URL (errors)
+                logging.getLogger(__name__).error(f"Dropping unwritable row {row[:2]!r}: {e}")
+    
+    def flush_if_due(self):
+        """Flush buffered rows once they have waited FLUSH_INTERVAL seconds."""
+        with self._buffer_lock:
+            due = ((self._page_buffer or self._error_buffer)
+                   and time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL)
+        if due:
+            self.flush()
+    
+    def analyze(self):
+        """Rebuild planner statistics for the main tables (e.g. after bulk imports)."""
+        self.flush()
+        with self.get_write() as conn:
+            conn.execute("ANALYZE pages")
+            conn.execute("ANALYZE errors")
+    
+    def close(self):
+        """Flush buffered rows and close the pooled connections."""
+        try:
+            self.flush()
+        finally:
+            with self._write_lock:
+                try:
+                    self._write_conn.execute("PRAGMA optimize")
+                finally:
+                    self._write_conn.close()
+            while True:
+                try:
+                    self._read_pool.get_nowait().close()
+                except Empty:
+                    break
     
     def start_session(self, start_url: str, max_depth: int, max_pages: int, config_data: dict = None) -> str:
         """Start a new crawl session and return session ID."""
         import time
         import json
-        with self.get_connection() as conn:
+        with self.get_write() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO crawl_sessions (start_url, max_depth, max_pages, started_at, config_data)
                 VALUES (?, ?, ?, ?, ?)
             """, (start_url, max_depth, max_pages, time.time(), json.dumps(config_data) if config_data else None))
-            conn.commit()
             return str(cursor.lastrowid)
     
     def end_session(self, session_id: str, pages_crawled: int, errors_occurred: int):
         """End a crawl session with final statistics."""
+        self.flush()
         import time
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE crawl_sessions SET 
-                    pages_crawled = ?, 
-                    total_errors = ?,
-                    completed_at = ?,
-                    status = 'completed'
-                WHERE id = ?
-            """, (pages_crawled, errors_occurred, time.time(), int(session_id)))
-            conn.commit()
+        with self.get_write() as conn:
+            conn.execute(self._SQL_UPDATE_SESSION, (pages_crawled, errors_occurred, time.time(), int(session_id)))
+            # Refresh planner statistics for tables that changed during the crawl
+            conn.execute("PRAGMA optimize")
     
     def save_page(self, session_id: str, url: str, title: str, content: str, 
                   status_code: int, content_type: str, content_length: int,
                   response_time: float = None, extracted_data: dict = None):
-        """Save page data to database."""
+        """Queue page data for the next batched database write."""
         import time
         import json
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO pages (
-                    url, title, status_code, content_type, content_length,
-                    response_time, timestamp, extracted_data
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (url, title, status_code, content_type, content_length,
-                  response_time, time.time(), json.dumps(extracted_data) if extracted_data else None))
-            conn.commit()
+        # Empty/missing data is stored as NULL rather than encoding "{}"
+        if not extracted_data:
+            extracted_json = None
+        elif orjson:
+            extracted_json = orjson.dumps(extracted_data, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        else:
+            extracted_json = json.dumps(extracted_data)
+        row = (url, title, status_code, content_type, content_length,
+               response_time, time.time(), extracted_json,
+               int(session_id) if session_id else None, extract_domain(url),
+               extracted_data.get('text_content') if extracted_data else None)
+        with self._buffer_lock:
+            self._page_buffer.append(row)
+            full = (len(self._page_buffer) >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL)
+        if full:
+            self.flush()
     
     def log_error(self, session_id: str, url: str, error_type: str, error_message: str):
-        """Log an error to database."""
+        """Queue an error for the next batched database write."""
         import time
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO errors (session_id, url, error_type, error_message, timestamp)
-                VALUES (?, ?, ?, ?, ?)
-            """, (int(session_id), url, error_type, error_message, time.time()))
-            conn.commit()
+        row = (int(session_id), url, error_type, error_message, time.time())
+        with self._buffer_lock:
+            self._error_buffer.append(row)
+            full = (len(self._error_buffer) >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL)
+        if full:
+            self.flush()
     
     def get_session_statistics(self, session_id: str) -> dict:
         """Get statistics for a specific session."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Get session info
-            cursor.execute("SELECT * FROM crawl_sessions WHERE id = ?", (int(session_id),))
-            session = cursor.fetchone()
-            
-            if not session:
+        self.flush()
+        with self.get_read() as conn:
+            # Session existence plus both counts in one statement (index-only counts)
+            row = conn.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM pages WHERE session_id = s.id) AS pages_stored,
+                    (SELECT COUNT(*) FROM errors WHERE session_id = s.id) AS errors_logged
+                FROM crawl_sessions s WHERE s.id = ?
+            """, (int(session_id),)).fetchone()
+            
+            if not row:
                 return {}
-            
-            # Get pages count for this session
-            cursor.execute("SELECT COUNT(*) FROM pages WHERE timestamp >= ?", (session[6],))  # started_at
-            pages_stored = cursor.fetchone()[0] if session[6] else 0
-            
-            # Get errors count
-            cursor.execute("SELECT COUNT(*) FROM errors WHERE session_id = ?", (int(session_id),))
-            errors_logged = cursor.fetchone()[0]
+            pages_stored, errors_logged = row
             
             return {
                 'pages_stored': pages_stored,
@@ -672,8 +952,9 @@ class DatabaseManager:
     
     def save_crawl_state(self, session_id: str, queue_urls: list, visited_urls: set):
         """Save current crawl state to database for resume functionality."""
+        self.flush()
         import json
-        with self.get_connection() as conn:
+        with self.get_write() as conn:
             cursor = conn.cursor()
             
             # Clear existing queue state for this session
@@ -696,12 +977,11 @@ class DatabaseManager:
                 UPDATE crawl_sessions SET crawl_state = ? WHERE id = ?
             """, (json.dumps(crawl_state), int(session_id)))
             
-            conn.commit()
     
     def load_crawl_state(self, session_id: str) -> dict:
         """Load crawl state for resume functionality."""
         import json
-        with self.get_connection() as conn:
+        with self.get_read() as conn:
             cursor = conn.cursor()
             
             # Get session data
@@ -754,7 +1034,7 @@ class DatabaseManager:
     
     def get_incomplete_sessions(self) -> list:
         """Get list of incomplete crawl sessions that can be resumed."""
-        with self.get_connection() as conn:
+        with self.get_read() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT id, start_url, max_pages, pages_crawled, started_at, status
@@ -766,12 +1046,12 @@ class DatabaseManager:
     
     def mark_session_interrupted(self, session_id: str):
         """Mark a session as interrupted (for clean shutdown)."""
-        with self.get_connection() as conn:
+        self.flush()
+        with self.get_write() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE crawl_sessions SET status = 'interrupted' WHERE id = ?
             """, (int(session_id),))
-            conn.commit()
 
 
 
@@ -800,7 +1080,8 @@ class WebCrawler:
                  min_content_length: int = 100,
                  max_content_length: int = None,
                  require_title: bool = False,
-                 language_filter: List[str] = None):
+                 language_filter: List[str] = None,
+                 commit_batch: int = None):
         """
         Initialize the web crawler.
         
@@ -824,6 +1105,8 @@ class WebCrawler:
             max_content_length: Maximum page content length
             require_title: Only crawl pages with titles
             language_filter: Only crawl pages in these languages
+            commit_batch: Buffered rows per database transaction (default
+                DatabaseManager.WRITE_BATCH_SIZE)
         """
         self.max_depth = max_depth
         self.delay = delay
@@ -840,6 +1123,7 @@ class WebCrawler:
         self.downloaded_pages = 0
         self.crawl_queue = Queue()  # Thread-safe queue for concurrent access
         self.robots_cache: Dict[str, RobotFileParser] = {}
+        self._robots_lock = threading.Lock()  # Guards robots_cache
         self._lock = threading.RLock()  # Reentrant lock for thread safety
         self._domain_last_request = {}  # Track last request time per domain for rate limiting
         
@@ -871,7 +1155,7 @@ class WebCrawler:
         self.session_id = None
         if self.use_database:
             db_path = self.output_dir / 'crawler_data.db'
-            self.db_manager = DatabaseManager(str(db_path))
+            self.db_manager = DatabaseManager(str(db_path), batch_size=commit_batch)
             
             # Handle resume functionality
             if self.resume_session:
@@ -1160,20 +1444,7 @@ class WebCrawler:
             parsed = urlparse(url)
             base_url = f"{parsed.scheme}://{parsed.netloc}"
             
-            # Check cache first
-            if base_url not in self.robots_cache:
-                robots_url = urljoin(base_url, '/robots.txt')
-                rp = RobotFileParser()
-                rp.set_url(robots_url)
-                
-                try:
-                    rp.read()
-                    self.robots_cache[base_url] = rp
-                except Exception:
-                    # If robots.txt can't be read, assume we can fetch
-                    self.robots_cache[base_url] = None
-            
-            robots_parser = self.robots_cache[base_url]
+            robots_parser = self._get_robots_parser(base_url)
             if robots_parser is None:
                 return True
                 
@@ -1182,6 +1453,26 @@ class WebCrawler:
         except Exception:
             return True
     
+    def _get_robots_parser(self, base_url: str) -> Optional[RobotFileParser]:
+        """Return the cached robots.txt parser for a site, fetching it once."""
+        with self._robots_lock:
+            if base_url in self.robots_cache:
+                return self.robots_cache[base_url]
+        
+        robots_url = urljoin(base_url, '/robots.txt')
+        rp = RobotFileParser()
+        rp.set_url(robots_url)
+        
+        try:
+            rp.read()
+        except Exception:
+            # If robots.txt can't be read, assume we can fetch
+            rp = None
+        
+        with self._robots_lock:
+            # Another worker may have fetched it meanwhile; keep the first result
+            return self.robots_cache.setdefault(base_url, rp)
+    
     def _fetch_page(self, url: str) -> Optional[requests.Response]:
         """
         Fetch a single webpage with detailed error logging.
@@ -1280,25 +1571,21 @@ class WebCrawler:
             domain_dir = self.output_dir / domain
             domain_dir.mkdir(exist_ok=True)
             
-            # Generate filename
+            # Generate filename: a URL hash prefix makes names unique per URL,
+            # so no existence checks are needed to avoid collisions
             if not path or path == '/':
-                filename = "index.html"
+                safe_tail = "index"
             else:
                 # Replace path separators and clean filename
-                filename = re.sub(r'[<>:"/\\|?*]', '_', path)
-                if not filename.endswith('.html'):
-                    filename += '.html'
+                safe_tail = re.sub(r'[<>:"/\\|?*]', '_', path)
+                if safe_tail.endswith('.html'):
+                    safe_tail = safe_tail[:-len('.html')]
+                safe_tail = safe_tail[-40:]
+            url_hash = hashlib.blake2b(url.encode('utf-8'), digest_size=8).hexdigest()
+            filename = f"{url_hash}_{safe_tail}.html"
             
             filepath = domain_dir / filename
             
-            # Handle duplicate filenames
-            counter = 1
-            original_filepath = filepath
-            while filepath.exists():
-                name, ext = original_filepath.stem, original_filepath.suffix
-                filepath = original_filepath.parent / f"{name}_{counter}{ext}"
-                counter += 1
-            
             # Save HTML content
             with open(filepath, 'w', encoding='utf-8', errors='ignore') as f:
                 f.write(response.text)
@@ -1307,8 +1594,13 @@ class WebCrawler:
             if extracted_data:
                 try:
                     json_file = filepath.with_suffix('.json')
-                    with open(json_file, 'w', encoding='utf-8') as f:
-                        json.dump(extracted_data, f, indent=2, ensure_ascii=False)
+                    if orjson:
+                        with open(json_file, 'wb') as f:
+                            f.write(orjson.dumps(extracted_data,
+                                                 option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+                    else:
+                        with open(json_file, 'w', encoding='utf-8') as f:
+                            json.dump(extracted_data, f, indent=2, ensure_ascii=False)
                     
                     self.stats['content_extracted'] += 1
                     self.logger.info(f"Extracted data: {json_file}")
@@ -1335,12 +1627,19 @@ class WebCrawler:
             
             # Save metadata
             metadata_file = filepath.with_suffix('.meta')
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                f.write(f"URL: {url}\n")
-                f.write(f"Status Code: {response.status_code}\n")
-                f.write(f"Content-Type: {response.headers.get('content-type', 'N/A')}\n")
-                f.write(f"Content-Length: {len(response.content)}\n")
-                f.write(f"Downloaded: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+            metadata = (
+                f"URL: {url}\n"
+                f"Status Code: {response.status_code}\n"
+                f"Content-Type: {response.headers.get('content-type', 'N/A')}\n"
+                f"Content-Length: {len(response.content)}\n"
+                f"Downloaded: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+            ).encode('utf-8')
+            # Encode once and issue a single write syscall
+            fd = os.open(metadata_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, metadata)
+            finally:
+                os.close(fd)
             
             self.logger.info(f"Saved: {filepath}")
             return True
@@ -1429,7 +1728,7 @@ class WebCrawler:
                         self.logger.warning(f"Progress callback error: {e}")
                 
                 # Get next URL from queue with timeout
-                current_url, depth = self.crawl_queue.get(timeout=5)
+                current_url, depth = self._next_queued_url(timeout=5)
             except Empty:
                 # No more URLs in queue
                 break
@@ -1522,6 +1821,37 @@ class WebCrawler:
                 self.logger.error(f"Worker thread error processing {current_url}: {e}")
             finally:
                 self.crawl_queue.task_done()
+        
+        # Write this worker's last rows now instead of when the crawl ends
+        self._flush_db(due_only=False)
+    
+    def _next_queued_url(self, timeout: float):
+        """Wait up to timeout seconds for a queued URL, flushing rows while idle.
+        
+        Waits in FLUSH_INTERVAL slices so buffered rows are written on time
+        even when no new pages arrive. Raises Empty if the queue stays empty.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise Empty
+            try:
+                return self.crawl_queue.get(timeout=min(remaining, DatabaseManager.FLUSH_INTERVAL))
+            except Empty:
+                self._flush_db(due_only=True)
+    
+    def _flush_db(self, due_only: bool):
+        """Write buffered database rows (only those FLUSH_INTERVAL old if due_only)."""
+        if not self.db_manager:
+            return
+        try:
+            if due_only:
+                self.db_manager.flush_if_due()
+            else:
+                self.db_manager.flush()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to flush database writes: {e}")
     
     def crawl(self, start_url: str, progress_callback=None):
         """
@@ -1532,6 +1862,15 @@ class WebCrawler:
             progress_callback: Optional callback function to report progress (for web UI)
                               Should return True to continue, False to stop
         """
+        try:
+            self._crawl(start_url, progress_callback)
+        finally:
+            # Flush buffered rows and release the database connections
+            if self.db_manager:
+                self.db_manager.close()
+    
+    def _crawl(self, start_url: str, progress_callback=None):
+        """Run the crawl; see crawl()."""
         start_url = self._normalize_url(start_url)
         
         if not self._is_valid_url(start_url):
@@ -1541,12 +1880,11 @@ class WebCrawler:
         # Update session with start URL if database is enabled
         if self.db_manager and self.session_id:
             try:
-                with self.db_manager.get_connection() as conn:
+                with self.db_manager.get_write() as conn:
                     conn.execute(
                         "UPDATE crawl_sessions SET start_url = ? WHERE id = ?",
                         (start_url, int(self.session_id))
                     )
-                    conn.commit()
             except Exception as e:
                 self.logger.warning(f"Failed to update session start URL: {e}")
         
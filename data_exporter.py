@@ -12,15 +12,345 @@ This module provides comprehensive data export capabilities including:
 
 import sqlite3
 import csv
+import io
 import json
-import xml.etree.ElementTree as ET
+from xml.sax.saxutils import XMLGenerator
 from datetime import datetime, timedelta
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional
 import argparse
+import string
 from collections import Counter, defaultdict
-import html
-from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+from url_utils import extract_domain
+
+# Use orjson for faster JSON serialization when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Use pyarrow's C++ CSV writer for page exports when available
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize an object to a compact JSON string (orjson when available)."""
+    if orjson:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, default=str)
+
+
+# In-process statistics cache keyed on (db path, db version, session id)
+_STATS_CACHE_SIZE = 32
+_stats_cache: Dict[tuple, Dict] = {}
+
+# Statistics fields holding distributions (persisted as [key, count] pairs)
+_STATS_DISTRIBUTION_FIELDS = ('domain_distribution', 'status_codes', 'content_types')
+
+
+# Arrow column types for the pages export (unlisted columns are written as strings)
+_PAGES_ARROW_TYPES = {
+    'id': pa.int64(),
+    'status_code': pa.int64(),
+    'content_length': pa.int64(),
+    'response_time': pa.float64(),
+} if pa else {}
+
+
+def _has_column(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    """Check whether a table has the given column."""
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+# Single-pass HTML escaping (same replacements as html.escape with quote=True)
+_HTML_ESCAPE_TABLE = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#x27;',
+})
+
+
+def _esc(text: str) -> str:
+    """Escape text for HTML output."""
+    return text.translate(_HTML_ESCAPE_TABLE)
+
+
+# Row templates for the HTML report
+_RECENT_PAGE_ROW = """
+            <tr>
+                <td><a href="{url}" target="_blank">{short_url}...</a></td>
+                <td>{title}...</td>
+                <td>{status_code}</td>
+                <td>{domain}</td>
+                <td>{crawled}</td>
+            </tr>
+            """
+
+_DIST_BAR_ROW = '<div class="dist-bar"><span>{label}</span><strong>{count}</strong></div>'
+
+# Static layout of the HTML report, compiled once at import time
+_HTML_REPORT_TEMPLATE = string.Template("""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Web Crawler Report</title>
+    <style>
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            margin: 0;
+            padding: 20px;
+            background-color: #f5f5f5;
+            color: #333;
+        }
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+            background: white;
+            padding: 30px;
+            border-radius: 10px;
+            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+        }
+        .header {
+            text-align: center;
+            margin-bottom: 40px;
+            padding-bottom: 20px;
+            border-bottom: 2px solid #e0e0e0;
+        }
+        .header h1 {
+            color: #2c3e50;
+            margin: 0;
+            font-size: 2.5em;
+        }
+        .header .timestamp {
+            color: #7f8c8d;
+            font-size: 1.1em;
+            margin-top: 10px;
+        }
+        .stats-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+            gap: 20px;
+            margin-bottom: 40px;
+        }
+        .stat-card {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 25px;
+            border-radius: 10px;
+            text-align: center;
+            box-shadow: 0 4px 15px rgba(0,0,0,0.1);
+        }
+        .stat-card h3 {
+            margin: 0 0 10px 0;
+            font-size: 1.1em;
+            opacity: 0.9;
+        }
+        .stat-card .value {
+            font-size: 2.5em;
+            font-weight: bold;
+            margin: 0;
+        }
+        .session-info {
+            background: #ecf0f1;
+            padding: 20px;
+            border-radius: 8px;
+            margin-bottom: 30px;
+        }
+        .charts-section {
+            margin: 40px 0;
+        }
+        .chart-container {
+            background: white;
+            padding: 20px;
+            border-radius: 8px;
+            margin: 20px 0;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.05);
+        }
+        .table-section {
+            margin: 40px 0;
+        }
+        table {
+            width: 100%;
+            border-collapse: collapse;
+            background: white;
+            border-radius: 8px;
+            overflow: hidden;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.05);
+        }
+        th {
+            background: #34495e;
+            color: white;
+            padding: 15px;
+            text-align: left;
+            font-weight: 600;
+        }
+        td {
+            padding: 12px 15px;
+            border-bottom: 1px solid #ecf0f1;
+        }
+        tr:hover {
+            background-color: #f8f9fa;
+        }
+        .distribution {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+            gap: 30px;
+            margin: 30px 0;
+        }
+        .distribution-item {
+            background: white;
+            padding: 20px;
+            border-radius: 8px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.05);
+        }
+        .distribution-item h4 {
+            color: #2c3e50;
+            margin-top: 0;
+        }
+        .dist-bar {
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            padding: 8px 0;
+            border-bottom: 1px solid #ecf0f1;
+        }
+        .dist-bar:last-child {
+            border-bottom: none;
+        }
+        .footer {
+            text-align: center;
+            margin-top: 50px;
+            padding-top: 20px;
+            border-top: 1px solid #e0e0e0;
+            color: #7f8c8d;
+        }
+    </style>
+    $chart_script
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🕷️ Web Crawler Report</h1>
+            <div class="timestamp">Generated on $generated_at</div>
+        </div>
+        
+        $session_info
+        
+        <div class="stats-grid">
+            <div class="stat-card">
+                <h3>Total Pages</h3>
+                <div class="value">$total_pages</div>
+            </div>
+            <div class="stat-card">
+                <h3>Total Links</h3>
+                <div class="value">$total_links</div>
+            </div>
+            <div class="stat-card">
+                <h3>Total Images</h3>
+                <div class="value">$total_images</div>
+            </div>
+            <div class="stat-card">
+                <h3>Content Size</h3>
+                <div class="value">$total_content_size_mb</div>
+                <small>MB</small>
+            </div>
+            <div class="stat-card">
+                <h3>Avg Response</h3>
+                <div class="value">$avg_response_time</div>
+                <small>seconds</small>
+            </div>
+            <div class="stat-card">
+                <h3>Domains</h3>
+                <div class="value">$domain_count</div>
+            </div>
+        </div>
+        
+        <div class="distribution">
+            <div class="distribution-item">
+                <h4>Top Domains</h4>
+                $domain_bars
+            </div>
+            <div class="distribution-item">
+                <h4>Status Codes</h4>
+                $status_bars
+            </div>
+        </div>
+        
+        $chart_canvas
+        
+        <div class="table-section">
+            <h3>Recent Pages</h3>
+            <table>
+                <thead>
+                    <tr>
+                        <th>URL</th>
+                        <th>Title</th>
+                        <th>Status</th>
+                        <th>Domain</th>
+                        <th>Crawled</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    $recent_pages_rows
+                </tbody>
+            </table>
+        </div>
+        
+        <div class="footer">
+            <p>Report generated by Advanced Web Crawler Export System</p>
+            <p>Database: $db_path</p>
+        </div>
+    </div>
+    
+    $domain_chart
+</body>
+</html>
+""")
+
+# Indexes backing the export filters, ordering and status/content-type grouping
+_EXPORT_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_pages_timestamp ON pages(timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_pages_status_content ON pages(status_code, content_type)",
+)
+
+# Statistics queries share one session-range filter so their prepared statements are reused
+_STATS_RANGE_FILTER = """
+    WHERE (:start IS NULL OR timestamp >= :start)
+      AND (:end IS NULL OR timestamp <= :end)
+"""
+
+_STATS_TOTALS_SQL = """
+    SELECT COUNT(*), AVG(response_time), SUM(content_length)
+    FROM pages""" + _STATS_RANGE_FILTER
+
+_STATS_URLS_SQL = """
+    SELECT url
+    FROM pages""" + _STATS_RANGE_FILTER
+
+_STATS_STATUS_TYPES_SQL = """
+    SELECT status_code, content_type, COUNT(*)
+    FROM pages""" + _STATS_RANGE_FILTER + """
+    GROUP BY status_code, content_type
+"""
+
+# Read-side tuning applied to every export connection
+_READ_PRAGMAS = (
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA query_only=1",
+)
 
 
 class DataExporter:
@@ -28,19 +358,52 @@ class DataExporter:
     Professional data export and reporting system for crawler data.
     """
     
+    # Rows fetched per round trip when streaming pages
+    PAGES_FETCH_SIZE = 1000
+    
+    # Pages listed in the HTML report's "Recent Pages" table
+    REPORT_RECENT_PAGES = 20
+    
     def __init__(self, db_path: str = "downloaded_pages/crawler_data.db"):
         """Initialize the data exporter with database connection."""
         self.db_path = db_path
+        self._session_range_cache: Dict[int, tuple] = {}
         self.ensure_db_exists()
     
     def ensure_db_exists(self):
         """Ensure the database file exists."""
         if not os.path.exists(self.db_path):
             raise FileNotFoundError(f"Database not found: {self.db_path}")
+        self._ensure_indexes()
+    
+    def _ensure_indexes(self):
+        """Create the indexes used by export queries (best effort)."""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                for statement in _EXPORT_INDEXES:
+                    conn.execute(statement)
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass  # Read-only database or missing pages table; fall back to table scans
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a read-only tuned connection (WAL, mmap, larger page cache)."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.Error:
+            pass  # Read-only media or locked database; keep the current journal mode
+        for pragma in _READ_PRAGMAS:
+            conn.execute(pragma)
+        conn.create_function("extract_domain", 1, extract_domain, deterministic=True)
+        return conn
     
     def get_connection(self) -> sqlite3.Connection:
         """Get database connection with row factory."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row  # Enable dict-like access
         return conn
     
@@ -65,10 +428,28 @@ class DataExporter:
             date_to: Filter by date to (YYYY-MM-DD format)
             limit: Limit number of results returned
         """
-        conn = self.get_connection()
+        rows = self.get_pages_rows_iter(session_id=session_id, domain_filter=domain_filter,
+                                        keyword_filter=keyword_filter, date_from=date_from,
+                                        date_to=date_to, limit=limit)
+        columns = next(rows)
+        return [dict(zip(columns, row)) for row in rows]
+    
+    def _build_pages_query(self, conn: sqlite3.Connection,
+                           session_id: Optional[int] = None,
+                           domain_filter: Optional[str] = None,
+                           keyword_filter: Optional[str] = None,
+                           date_from: Optional[str] = None,
+                           date_to: Optional[str] = None,
+                           limit: Optional[int] = None) -> tuple:
+        """Build the filtered pages query and its parameters."""
+        # Databases from before the crawler stored pages.domain get it from the URL
+        if _has_column(conn, 'pages', 'domain'):
+            domain_sql = "COALESCE(p.domain, extract_domain(p.url))"
+        else:
+            domain_sql = "extract_domain(p.url)"
         
         # Simplified query to match actual database schema
-        query = """
+        query = f"""
         SELECT 
             p.id,
             p.url,
@@ -76,9 +457,10 @@ class DataExporter:
             p.status_code,
             p.content_length,
             p.content_type,
-            p.timestamp as crawl_timestamp,
+            strftime('%Y-%m-%dT%H:%M:%S', p.timestamp, 'unixepoch', 'localtime') as crawl_timestamp,
             p.response_time,
-            p.extracted_data
+            p.extracted_data,
+            {domain_sql} as domain
         FROM pages p
         WHERE 1=1
         """
@@ -90,12 +472,7 @@ class DataExporter:
             # For now, we'll filter by timestamp range if we know the session
             try:
                 # Get session timing to approximate filtering
-                session_conn = self.get_connection()
-                session_cursor = session_conn.execute(
-                    "SELECT started_at, completed_at FROM crawl_sessions WHERE id = ?", 
-                    (session_id,)
-                )
-                session_data = session_cursor.fetchone()
+                session_data = self._session_range(conn, session_id)
                 if session_data:
                     start_time, end_time = session_data
                     if start_time:
@@ -104,7 +481,6 @@ class DataExporter:
                     if end_time:
                         query += " AND p.timestamp <= ?"
                         params.append(end_time)
-                session_conn.close()
             except Exception:
                 # If session lookup fails, ignore session filter
                 pass
@@ -121,14 +497,12 @@ class DataExporter:
         
         if date_from:
             # Convert date to timestamp for comparison
-            from datetime import datetime
             date_ts = datetime.strptime(date_from, '%Y-%m-%d').timestamp()
             query += " AND p.timestamp >= ?"
             params.append(date_ts)
         
         if date_to:
             # Convert date to timestamp for comparison
-            from datetime import datetime
             date_ts = datetime.strptime(date_to + ' 23:59:59', '%Y-%m-%d %H:%M:%S').timestamp()
             query += " AND p.timestamp <= ?"
             params.append(date_ts)
@@ -138,18 +512,47 @@ class DataExporter:
         if limit:
             query += f" LIMIT {limit}"
         
-        cursor = conn.execute(query, params)
-        results = [dict(row) for row in cursor.fetchall()]
+        return query, params
+    
+    def get_pages_rows_iter(self, **filters):
+        """
+        Stream pages as plain tuples straight from the SQLite cursor.
         
-        # Add derived fields for compatibility
-        for result in results:
-            if result.get('url'):
-                parsed = urlparse(result['url'])
-                result['domain'] = parsed.netloc
-                result['crawl_timestamp'] = datetime.fromtimestamp(result.get('timestamp', 0)).isoformat() if result.get('timestamp') else None
+        Yields the tuple of column names first, then one tuple per row, so
+        callers can write large exports without materializing every row.
+        Rows are fetched from SQLite in batches of ``PAGES_FETCH_SIZE``.
+        """
+        conn = self._connect()
+        try:
+            query, params = self._build_pages_query(conn, **filters)
+            cursor = conn.execute(query, params)
+            cursor.arraysize = self.PAGES_FETCH_SIZE
+            yield tuple(column[0] for column in cursor.description)
+            while True:
+                batch = cursor.fetchmany()
+                if not batch:
+                    break
+                yield from batch
+        finally:
+            conn.close()
+    
+    def _session_range(self, conn: sqlite3.Connection, session_id: int) -> Optional[tuple]:
+        """
+        Look up a session's (started_at, completed_at) range on an open connection.
         
-        conn.close()
-        return results
+        Completed sessions are cached since their range can no longer change.
+        """
+        if session_id in self._session_range_cache:
+            return self._session_range_cache[session_id]
+        
+        row = conn.execute(
+            "SELECT started_at, completed_at FROM crawl_sessions WHERE id = ?",
+            (session_id,)
+        ).fetchone()
+        session_range = tuple(row) if row else None
+        if session_range and session_range[1]:
+            self._session_range_cache[session_id] = session_range
+        return session_range
     
     def get_links_data(self, session_id: Optional[int] = None) -> List[Dict]:
         """Retrieve links data - simplified for current schema."""
@@ -192,6 +595,83 @@ class DataExporter:
         return results
     
     def get_crawl_statistics(self, session_id: Optional[int] = None) -> Dict:
+        """
+        Get crawl statistics, reusing cached results while the database is unchanged.
+        
+        Results are cached in-process and in a JSON sidecar next to the
+        database, keyed on the database file's modification stamp.
+        """
+        version = self._db_version()
+        key = (os.path.abspath(self.db_path), version, session_id)
+        stats = _stats_cache.get(key)
+        if stats is None:
+            stats = self._read_stats_sidecar(version, session_id)
+            if stats is None:
+                stats = self._compute_crawl_statistics(session_id)
+                self._write_stats_sidecar(version, session_id, stats)
+            if len(_stats_cache) >= _STATS_CACHE_SIZE:
+                _stats_cache.pop(next(iter(_stats_cache)))
+            _stats_cache[key] = stats
+        return dict(stats)
+    
+    def _db_version(self) -> tuple:
+        """Return a stamp that changes whenever the database (or its WAL) is written."""
+        version = []
+        for path in (self.db_path, self.db_path + '-wal'):
+            try:
+                st = os.stat(path)
+                version.extend([st.st_mtime_ns, st.st_size])
+            except OSError:
+                version.extend([0, 0])
+        return tuple(version)
+    
+    def _stats_sidecar_path(self) -> str:
+        """Path of the on-disk statistics cache for this database."""
+        return self.db_path + '.stats_cache.json'
+    
+    def _read_stats_sidecar(self, version: tuple, session_id: Optional[int]) -> Optional[Dict]:
+        """Load cached statistics from the sidecar if it matches the database version."""
+        try:
+            with open(self._stats_sidecar_path(), 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if tuple(cache.get('version', ())) != version:
+            return None
+        stats = cache.get('sessions', {}).get(str(session_id))
+        if stats is None:
+            return None
+        
+        # Distributions are stored as [key, count] pairs to keep non-string keys intact
+        for field in _STATS_DISTRIBUTION_FIELDS:
+            stats[field] = dict(map(tuple, stats.get(field, [])))
+        return stats
+    
+    def _write_stats_sidecar(self, version: tuple, session_id: Optional[int], stats: Dict):
+        """Store statistics in the sidecar, discarding entries from older versions."""
+        path = self._stats_sidecar_path()
+        cache = {'version': list(version), 'sessions': {}}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+            if tuple(existing.get('version', ())) == version:
+                cache['sessions'] = existing.get('sessions', {})
+        except (OSError, ValueError):
+            pass
+        
+        entry = dict(stats)
+        for field in _STATS_DISTRIBUTION_FIELDS:
+            entry[field] = list(stats.get(field, {}).items())
+        cache['sessions'][str(session_id)] = entry
+        
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+        except OSError:
+            pass  # Caching is best-effort (e.g. read-only output directory)
+    
+    def _compute_crawl_statistics(self, session_id: Optional[int] = None) -> Dict:
         """Generate comprehensive crawl statistics."""
         conn = self.get_connection()
         
@@ -199,90 +679,81 @@ class DataExporter:
         stats = {}
         
         # Session filter (approximate by timestamp if session_id provided)
-        session_filter = ""
-        params = []
+        bounds = {'start': None, 'end': None}
         if session_id:
             try:
                 # Get session timing
-                session_cursor = conn.execute(
-                    "SELECT started_at, completed_at FROM crawl_sessions WHERE id = ?", 
-                    (session_id,)
-                )
-                session_data = session_cursor.fetchone()
+                session_data = self._session_range(conn, session_id)
                 if session_data:
-                    start_time, end_time = session_data
-                    if start_time and end_time:
-                        session_filter = "WHERE timestamp BETWEEN ? AND ?"
-                        params = [start_time, end_time]
-                    elif start_time:
-                        session_filter = "WHERE timestamp >= ?"
-                        params = [start_time]
+                    bounds['start'], bounds['end'] = session_data
             except Exception:
                 pass
         
-        # Total pages
-        cursor = conn.execute(f"SELECT COUNT(*) FROM pages {session_filter}", params)
-        stats['total_pages'] = cursor.fetchone()[0]
+        # Totals in one scan: page count, average response time, content size
+        # (AVG and SUM already skip NULL values)
+        total_pages, avg_response, total_size = conn.execute(_STATS_TOTALS_SQL, bounds).fetchone()
+        stats['total_pages'] = total_pages
         
         # Total links and images (simplified - not stored separately)
         stats['total_links'] = 0
         stats['total_images'] = 0
         
-        # Domain distribution
-        cursor = conn.execute(f"""
-            SELECT 
-                CASE 
-                    WHEN url LIKE 'http://%' THEN SUBSTR(url, 8, INSTR(SUBSTR(url, 8), '/') - 1)
-                    WHEN url LIKE 'https://%' THEN SUBSTR(url, 9, INSTR(SUBSTR(url, 9), '/') - 1)
-                    ELSE 'unknown'
-                END as domain,
-                COUNT(*) as count 
-            FROM pages {session_filter}
-            GROUP BY domain 
-            ORDER BY count DESC
-        """, params)
-        stats['domain_distribution'] = dict(cursor.fetchall())
-        
-        # Status code distribution
-        cursor = conn.execute(f"""
-            SELECT status_code, COUNT(*) as count 
-            FROM pages {session_filter}
-            GROUP BY status_code 
-            ORDER BY count DESC
-        """, params)
-        stats['status_codes'] = dict(cursor.fetchall())
-        
-        # Content type distribution
-        cursor = conn.execute(f"""
-            SELECT content_type, COUNT(*) as count 
-            FROM pages {session_filter}
-            GROUP BY content_type 
-            ORDER BY count DESC
-        """, params)
-        stats['content_types'] = dict(cursor.fetchall())
-        
-        # Average response time
-        cursor = conn.execute(f"""
-            SELECT AVG(response_time) 
-            FROM pages 
-            {'WHERE' if not session_filter else session_filter + ' AND'} response_time IS NOT NULL
-        """, params)
-        avg_response = cursor.fetchone()[0]
-        stats['avg_response_time'] = round(avg_response, 3) if avg_response else 0
+        # Domain distribution (hosts counted in Python from a single url column scan)
+        domains = Counter(extract_domain(url) or 'unknown'
+                          for (url,) in conn.execute(_STATS_URLS_SQL, bounds))
+        stats['domain_distribution'] = dict(domains.most_common())
+        
+        # Status code and content type distributions from a single grouped scan
+        status_codes = Counter()
+        content_types = Counter()
+        for status_code, content_type, count in conn.execute(_STATS_STATUS_TYPES_SQL, bounds):
+            status_codes[status_code] += count
+            content_types[content_type] += count
+        stats['status_codes'] = dict(status_codes.most_common())
+        stats['content_types'] = dict(content_types.most_common())
         
-        # Total content size
-        cursor = conn.execute(f"""
-            SELECT SUM(content_length) 
-            FROM pages 
-            {'WHERE' if not session_filter else session_filter + ' AND'} content_length IS NOT NULL
-        """, params)
-        total_size = cursor.fetchone()[0]
+        stats['avg_response_time'] = round(avg_response, 3) if avg_response else 0
         stats['total_content_size'] = total_size or 0
         stats['total_content_size_mb'] = round((total_size or 0) / 1024 / 1024, 2)
         
         conn.close()
         return stats
     
+    @staticmethod
+    def _stats_from_pages(pages: Iterable[Dict]) -> Dict:
+        """Build crawl statistics in one pass over page records."""
+        total_pages = 0
+        domains = Counter()
+        status_codes = Counter()
+        content_types = Counter()
+        response_total = 0.0
+        response_count = 0
+        total_size = 0
+        
+        for page in pages:
+            total_pages += 1
+            domains[page.get('domain') or 'unknown'] += 1
+            status_codes[page.get('status_code')] += 1
+            content_types[page.get('content_type')] += 1
+            response_time = page.get('response_time')
+            if response_time is not None:
+                response_total += response_time
+                response_count += 1
+            total_size += page.get('content_length') or 0
+        
+        avg_response = response_total / response_count if response_count else 0
+        return {
+            'total_pages': total_pages,
+            'total_links': 0,
+            'total_images': 0,
+            'domain_distribution': dict(domains.most_common()),
+            'status_codes': dict(status_codes.most_common()),
+            'content_types': dict(content_types.most_common()),
+            'avg_response_time': round(avg_response, 3) if avg_response else 0,
+            'total_content_size': total_size,
+            'total_content_size_mb': round(total_size / 1024 / 1024, 2),
+        }
+    
     # ========================================
     # CSV EXPORT METHODS
     # ========================================
@@ -297,7 +768,7 @@ class DataExporter:
             **filters: Filtering options
         """
         if data_type == "pages":
-            data = self.get_pages_data(**filters)
+            return self._export_pages_to_csv(output_file, **filters)
         elif data_type == "links":
             data = self.get_links_data(**filters)
         elif data_type == "images":
@@ -322,6 +793,78 @@ class DataExporter:
         
         return f"Exported {len(data)} {data_type} records to {output_file}"
     
+    def _export_pages_to_csv(self, output_file: str, **filters) -> str:
+        """Stream pages rows from the database cursor directly into a CSV file."""
+        rows = self.get_pages_rows_iter(**filters)
+        header = next(rows)
+        first_row = next(rows, None)
+        if first_row is None:
+            rows.close()
+            raise ValueError("No pages data found with given filters")
+        
+        # Ensure output directory exists
+        os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else ".", exist_ok=True)
+        
+        if pa_csv:
+            count = self._write_pages_csv_arrow(output_file, header, first_row, rows)
+        else:
+            count = 1
+            with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(header)
+                writer.writerow(first_row)
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+        
+        return f"Exported {count} pages records to {output_file}"
+    
+    def iter_csv_rows(self, **filters):
+        """
+        Yield the pages CSV as text chunks of up to ``PAGES_FETCH_SIZE`` rows.
+        
+        Nothing is written to disk, so a web response can send the export
+        while it is still being read from the database.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        pending = 0
+        for row in self.get_pages_rows_iter(**filters):
+            writer.writerow(row)
+            pending += 1
+            if pending >= self.PAGES_FETCH_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if pending:
+            yield buffer.getvalue()
+    
+    def _write_pages_csv_arrow(self, output_file: str, header: tuple, first_row: tuple, rows) -> int:
+        """Write streamed page rows to CSV in record batches with pyarrow."""
+        schema = pa.schema([
+            (name, _PAGES_ARROW_TYPES.get(name, pa.string())) for name in header
+        ])
+        count = 0
+        batch = [first_row]
+        with pa_csv.CSVWriter(output_file, schema) as writer:
+            def flush():
+                columns = zip(*batch)
+                writer.write_batch(pa.RecordBatch.from_arrays(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                    schema=schema))
+            
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.PAGES_FETCH_SIZE:
+                    flush()
+                    count += len(batch)
+                    batch = []
+            if batch:
+                flush()
+                count += len(batch)
+        return count
+    
     # ========================================
     # JSON EXPORT METHODS
     # ========================================
@@ -345,34 +888,110 @@ class DataExporter:
             }
         }
         
-        if data_type == "pages":
-            export_data["pages"] = self.get_pages_data(**filters)
-        elif data_type == "links":
-            export_data["links"] = self.get_links_data(**filters)
-        elif data_type == "images":
-            export_data["images"] = self.get_images_data(**filters)
-        elif data_type == "sessions":
-            export_data["sessions"] = self.get_sessions_data()
-        elif data_type == "all":
-            export_data["pages"] = self.get_pages_data(**filters)
-            export_data["links"] = self.get_links_data(**filters)
-            export_data["images"] = self.get_images_data(**filters)
-            export_data["sessions"] = self.get_sessions_data()
+        loaders = {
+            "pages": lambda: self.get_pages_data(**filters),
+            "links": lambda: self.get_links_data(**filters),
+            "images": lambda: self.get_images_data(**filters),
+            "sessions": self.get_sessions_data,
+        }
+        if data_type == "all":
+            sections = list(loaders)
+        elif data_type in loaders:
+            sections = [data_type]
         else:
             raise ValueError(f"Unsupported data type: {data_type}")
         
-        if include_stats:
-            export_data["statistics"] = self.get_crawl_statistics(filters.get('session_id'))
+        # Reuse the loaded pages for statistics when they cover the whole (session) selection
+        session_only = all(value is None for key, value in filters.items() if key != 'session_id')
+        stats_from_pages = include_stats and "pages" in sections and session_only
+        if include_stats and not stats_from_pages:
+            loaders["statistics"] = lambda: self.get_crawl_statistics(filters.get('session_id'))
+            sections.append("statistics")
+        
+        if data_type in ("all", "pages"):
+            return self._stream_all_json(output_file, export_data["export_info"], loaders,
+                                         sections, stats_from_pages, filters)
+        
+        if len(sections) > 1:
+            # Independent reads each open their own connection; WAL lets them run concurrently
+            with ThreadPoolExecutor(max_workers=min(len(sections), 4)) as executor:
+                futures = {section: executor.submit(loaders[section]) for section in sections}
+                for section in sections:
+                    export_data[section] = futures[section].result()
+        else:
+            export_data[sections[0]] = loaders[sections[0]]()
+        
+        if stats_from_pages:
+            export_data["statistics"] = self._stats_from_pages(export_data["pages"])
         
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else ".", exist_ok=True)
         
-        with open(output_file, 'w', encoding='utf-8') as jsonfile:
-            json.dump(export_data, jsonfile, indent=2, default=str)
+        if orjson:
+            with open(output_file, 'wb') as jsonfile:
+                jsonfile.write(orjson.dumps(export_data, default=str,
+                                            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(output_file, 'w', encoding='utf-8') as jsonfile:
+                json.dump(export_data, jsonfile, indent=2, default=str)
         
         record_count = len(export_data.get(data_type, export_data.get("pages", [])))
         return f"Exported {record_count} records to {output_file}"
     
+    def _stream_all_json(self, output_file: str, export_info: Dict, loaders: Dict,
+                         sections: List[str], stats_from_pages: bool, filters: Dict) -> str:
+        """
+        Write a pages or full ("all") JSON export, streaming pages row by row.
+        
+        Pages are serialized straight from the SQLite cursor while the small
+        remaining sections load on worker threads, so peak memory no longer
+        grows with the number of pages.
+        """
+        # Ensure output directory exists
+        os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else ".", exist_ok=True)
+        
+        if orjson:
+            def dumps(obj):
+                return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+        else:
+            def dumps(obj):
+                return json.dumps(obj, default=str).encode('utf-8')
+        
+        other_sections = [section for section in sections if section != "pages"]
+        count = 0
+        with ThreadPoolExecutor(max_workers=max(1, min(len(other_sections), 4))) as executor, \
+                open(output_file, 'wb') as jsonfile:
+            futures = {section: executor.submit(loaders[section]) for section in other_sections}
+            
+            rows = self.get_pages_rows_iter(**filters)
+            columns = next(rows)
+            
+            def written_pages():
+                # Yield each page after writing it so statistics can be folded in the same pass
+                nonlocal count
+                separator = b"\n    "
+                for row in rows:
+                    page = dict(zip(columns, row))
+                    jsonfile.write(separator + dumps(page))
+                    separator = b",\n    "
+                    count += 1
+                    yield page
+            
+            jsonfile.write(b'{\n  "export_info": ' + dumps(export_info) + b',\n  "pages": [')
+            pages = written_pages()
+            stats = self._stats_from_pages(pages) if stats_from_pages else None
+            for _ in pages:
+                pass  # Drain remaining rows when statistics did not consume them
+            jsonfile.write(b"\n  ]")
+            
+            for section in other_sections:
+                jsonfile.write(b',\n  "' + section.encode('utf-8') + b'": ' + dumps(futures[section].result()))
+            if stats is not None:
+                jsonfile.write(b',\n  "statistics": ' + dumps(stats))
+            jsonfile.write(b"\n}\n")
+        
+        return f"Exported {count} records to {output_file}"
+    
     # ========================================
     # XML EXPORT METHODS
     # ========================================
@@ -386,67 +1005,86 @@ class DataExporter:
             data_type: Type of data to export
             **filters: Filtering options
         """
-        root = ET.Element("crawler_export")
-        
-        # Add export info
-        export_info = ET.SubElement(root, "export_info")
-        ET.SubElement(export_info, "timestamp").text = datetime.now().isoformat()
-        ET.SubElement(export_info, "data_type").text = data_type
-        
-        # Add filters info
-        if filters:
-            filters_elem = ET.SubElement(export_info, "filters")
-            for key, value in filters.items():
-                if value is not None:
-                    ET.SubElement(filters_elem, key).text = str(value)
-        
-        # Get and add data
+        # Resolve the record source up front so bad data types fail before writing
         if data_type == "pages":
-            data = self.get_pages_data(**filters)
-            data_elem = ET.SubElement(root, "pages")
-            for page in data:
-                page_elem = ET.SubElement(data_elem, "page")
-                for key, value in page.items():
-                    if value is not None:
-                        ET.SubElement(page_elem, key).text = str(value)
-        
+            rows = self.get_pages_rows_iter(**filters)
+            columns = next(rows)
         elif data_type == "links":
-            data = self.get_links_data(**filters)
-            data_elem = ET.SubElement(root, "links")
-            for link in data:
-                link_elem = ET.SubElement(data_elem, "link")
-                for key, value in link.items():
-                    if value is not None:
-                        ET.SubElement(link_elem, key).text = str(value)
-        
+            records = self.get_links_data(**filters)
         elif data_type == "sessions":
-            data = self.get_sessions_data()
-            data_elem = ET.SubElement(root, "sessions")
-            for session in data:
-                session_elem = ET.SubElement(data_elem, "session")
-                for key, value in session.items():
-                    if value is not None:
-                        ET.SubElement(session_elem, key).text = str(value)
-        
+            records = self.get_sessions_data()
         else:
             raise ValueError(f"Unsupported data type: {data_type}")
         
+        if data_type != "pages":
+            columns = tuple(records[0].keys()) if records else ()
+            rows = (tuple(record.values()) for record in records)
+        record_tag = {"pages": "page", "links": "link", "sessions": "session"}[data_type]
+        
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else ".", exist_ok=True)
         
-        # Write XML file
-        tree = ET.ElementTree(root)
-        ET.indent(tree, space="  ", level=0)
-        tree.write(output_file, encoding='utf-8', xml_declaration=True)
-        
-        return f"Exported {len(data)} {data_type} records to {output_file}"
+        # Stream the XML document straight to disk
+        count = 0
+        with open(output_file, 'wb') as f:
+            gen = XMLGenerator(f, encoding='utf-8', short_empty_elements=True)
+            
+            def text_element(tag, value, depth):
+                gen.ignorableWhitespace("\n" + "  " * depth)
+                gen.startElement(tag, {})
+                gen.characters(str(value))
+                gen.endElement(tag)
+            
+            def start(tag, depth):
+                gen.ignorableWhitespace("\n" + "  " * depth)
+                gen.startElement(tag, {})
+            
+            def end(tag, depth):
+                gen.ignorableWhitespace("\n" + "  " * depth)
+                gen.endElement(tag)
+            
+            gen.startDocument()
+            gen.startElement("crawler_export", {})
+            
+            # Add export info
+            start("export_info", 1)
+            text_element("timestamp", datetime.now().isoformat(), 2)
+            text_element("data_type", data_type, 2)
+            
+            # Add filters info
+            if filters:
+                start("filters", 2)
+                for key, value in filters.items():
+                    if value is not None:
+                        text_element(key, value, 3)
+                end("filters", 2)
+            end("export_info", 1)
+            
+            start(data_type, 1)
+            for row in rows:
+                start(record_tag, 2)
+                for key, value in zip(columns, row):
+                    if value is not None:
+                        text_element(key, value, 3)
+                end(record_tag, 2)
+                count += 1
+            if count:
+                end(data_type, 1)
+            else:
+                gen.endElement(data_type)
+            
+            end("crawler_export", 0)
+            gen.endDocument()
+        
+        return f"Exported {count} {data_type} records to {output_file}"
     
     # ========================================
     # HTML REPORT METHODS
     # ========================================
     
     def generate_html_report(self, output_file: str, session_id: Optional[int] = None,
-                           include_charts: bool = True) -> str:
+                           include_charts: bool = True,
+                           recent_pages: int = REPORT_RECENT_PAGES) -> str:
         """
         Generate comprehensive HTML report with statistics and charts.
         
@@ -454,9 +1092,10 @@ class DataExporter:
             output_file: Output HTML file path
             session_id: Optional session ID to filter by
             include_charts: Whether to include interactive charts
+            recent_pages: Number of most recent pages listed in the report table
         """
         stats = self.get_crawl_statistics(session_id)
-        pages_data = self.get_pages_data(session_id=session_id, limit=100)  # Limit for performance
+        pages_data = self.get_pages_data(session_id=session_id, limit=recent_pages)
         sessions_data = self.get_sessions_data()
         
         html_content = self._generate_html_template(stats, pages_data, sessions_data, 
@@ -497,10 +1136,10 @@ class DataExporter:
             domain_chart = f"""
             <script>
                 const domainData = {{
-                    labels: {json.dumps(domains)},
+                    labels: {_json_dumps(domains)},
                     datasets: [{{
                         label: 'Pages per Domain',
-                        data: {json.dumps(counts)},
+                        data: {_json_dumps(counts)},
                         backgroundColor: 'rgba(54, 162, 235, 0.6)',
                         borderColor: 'rgba(54, 162, 235, 1)',
                         borderWidth: 1
@@ -525,241 +1164,48 @@ class DataExporter:
             """
         
         # Generate recent pages table
-        recent_pages_rows = ""
-        for page in pages_data[:20]:  # Top 20 recent pages
-            recent_pages_rows += f"""
-            <tr>
-                <td><a href="{html.escape(page.get('url', ''))}" target="_blank">{html.escape(page.get('url', '')[:60])}...</a></td>
-                <td>{html.escape(page.get('title', '') or 'No Title')[:40]}...</td>
-                <td>{page.get('status_code', 'N/A')}</td>
-                <td>{page.get('domain', 'N/A')}</td>
-                <td>{page.get('crawl_timestamp', 'N/A')}</td>
-            </tr>
-            """
-        
-        html_template = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Web Crawler Report</title>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-            color: #333;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
-        .header {{
-            text-align: center;
-            margin-bottom: 40px;
-            padding-bottom: 20px;
-            border-bottom: 2px solid #e0e0e0;
-        }}
-        .header h1 {{
-            color: #2c3e50;
-            margin: 0;
-            font-size: 2.5em;
-        }}
-        .header .timestamp {{
-            color: #7f8c8d;
-            font-size: 1.1em;
-            margin-top: 10px;
-        }}
-        .stats-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin-bottom: 40px;
-        }}
-        .stat-card {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 25px;
-            border-radius: 10px;
-            text-align: center;
-            box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-        }}
-        .stat-card h3 {{
-            margin: 0 0 10px 0;
-            font-size: 1.1em;
-            opacity: 0.9;
-        }}
-        .stat-card .value {{
-            font-size: 2.5em;
-            font-weight: bold;
-            margin: 0;
-        }}
-        .session-info {{
-            background: #ecf0f1;
-            padding: 20px;
-            border-radius: 8px;
-            margin-bottom: 30px;
-        }}
-        .charts-section {{
-            margin: 40px 0;
-        }}
-        .chart-container {{
-            background: white;
-            padding: 20px;
-            border-radius: 8px;
-            margin: 20px 0;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.05);
-        }}
-        .table-section {{
-            margin: 40px 0;
-        }}
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            background: white;
-            border-radius: 8px;
-            overflow: hidden;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.05);
-        }}
-        th {{
-            background: #34495e;
-            color: white;
-            padding: 15px;
-            text-align: left;
-            font-weight: 600;
-        }}
-        td {{
-            padding: 12px 15px;
-            border-bottom: 1px solid #ecf0f1;
-        }}
-        tr:hover {{
-            background-color: #f8f9fa;
-        }}
-        .distribution {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 30px;
-            margin: 30px 0;
-        }}
-        .distribution-item {{
-            background: white;
-            padding: 20px;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.05);
-        }}
-        .distribution-item h4 {{
-            color: #2c3e50;
-            margin-top: 0;
-        }}
-        .dist-bar {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            padding: 8px 0;
-            border-bottom: 1px solid #ecf0f1;
-        }}
-        .dist-bar:last-child {{
-            border-bottom: none;
-        }}
-        .footer {{
-            text-align: center;
-            margin-top: 50px;
-            padding-top: 20px;
-            border-top: 1px solid #e0e0e0;
-            color: #7f8c8d;
-        }}
-    </style>
-    {'<script src="https://cdn.jsdelivr.net/npm/chart.js"></script>' if include_charts else ''}
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🕷️ Web Crawler Report</h1>
-            <div class="timestamp">Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>
-        </div>
-        
-        {session_info}
-        
-        <div class="stats-grid">
-            <div class="stat-card">
-                <h3>Total Pages</h3>
-                <div class="value">{stats.get('total_pages', 0):,}</div>
-            </div>
-            <div class="stat-card">
-                <h3>Total Links</h3>
-                <div class="value">{stats.get('total_links', 0):,}</div>
-            </div>
-            <div class="stat-card">
-                <h3>Total Images</h3>
-                <div class="value">{stats.get('total_images', 0):,}</div>
-            </div>
-            <div class="stat-card">
-                <h3>Content Size</h3>
-                <div class="value">{stats.get('total_content_size_mb', 0)}</div>
-                <small>MB</small>
-            </div>
-            <div class="stat-card">
-                <h3>Avg Response</h3>
-                <div class="value">{stats.get('avg_response_time', 0)}</div>
-                <small>seconds</small>
-            </div>
-            <div class="stat-card">
-                <h3>Domains</h3>
-                <div class="value">{len(stats.get('domain_distribution', {}))}</div>
-            </div>
-        </div>
-        
-        <div class="distribution">
-            <div class="distribution-item">
-                <h4>Top Domains</h4>
-                {"".join([f'<div class="dist-bar"><span>{domain}</span><strong>{count}</strong></div>' 
-                         for domain, count in list(stats.get('domain_distribution', {}).items())[:10]])}
-            </div>
-            <div class="distribution-item">
-                <h4>Status Codes</h4>
-                {"".join([f'<div class="dist-bar"><span>HTTP {code}</span><strong>{count}</strong></div>' 
-                         for code, count in stats.get('status_codes', {}).items()])}
-            </div>
-        </div>
-        
-        {f'<div class="charts-section"><div class="chart-container"><canvas id="domainChart" width="400" height="200"></canvas></div></div>' if include_charts else ''}
-        
-        <div class="table-section">
-            <h3>Recent Pages</h3>
-            <table>
-                <thead>
-                    <tr>
-                        <th>URL</th>
-                        <th>Title</th>
-                        <th>Status</th>
-                        <th>Domain</th>
-                        <th>Crawled</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {recent_pages_rows}
-                </tbody>
-            </table>
-        </div>
-        
-        <div class="footer">
-            <p>Report generated by Advanced Web Crawler Export System</p>
-            <p>Database: {html.escape(self.db_path)}</p>
-        </div>
-    </div>
-    
-    {domain_chart}
-</body>
-</html>
-        """
-        
-        return html_template
+        recent_pages_rows = "".join([
+            _RECENT_PAGE_ROW.format(
+                url=_esc(page.get('url', '')),
+                short_url=_esc(page.get('url', '')[:60]),
+                title=_esc(page.get('title', '') or 'No Title')[:40],
+                status_code=page.get('status_code', 'N/A'),
+                domain=page.get('domain', 'N/A'),
+                crawled=page.get('crawl_timestamp', 'N/A'),
+            )
+            for page in pages_data
+        ])
+        
+        # Build distribution lists outside the main template
+        domain_bars = "".join([
+            _DIST_BAR_ROW.format(label=domain, count=count)
+            for domain, count in list(stats.get('domain_distribution', {}).items())[:10]
+        ])
+        status_bars = "".join([
+            _DIST_BAR_ROW.format(label=f"HTTP {code}", count=count)
+            for code, count in stats.get('status_codes', {}).items()
+        ])
+        
+        return _HTML_REPORT_TEMPLATE.substitute(
+            chart_script=('<script src="https://cdn.jsdelivr.net/npm/chart.js"></script>'
+                          if include_charts else ''),
+            generated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            session_info=session_info,
+            total_pages=f"{stats.get('total_pages', 0):,}",
+            total_links=f"{stats.get('total_links', 0):,}",
+            total_images=f"{stats.get('total_images', 0):,}",
+            total_content_size_mb=stats.get('total_content_size_mb', 0),
+            avg_response_time=stats.get('avg_response_time', 0),
+            domain_count=len(stats.get('domain_distribution', {})),
+            domain_bars=domain_bars,
+            status_bars=status_bars,
+            chart_canvas=('<div class="charts-section"><div class="chart-container">'
+                          '<canvas id="domainChart" width="400" height="200"></canvas></div></div>'
+                          if include_charts else ''),
+            recent_pages_rows=recent_pages_rows,
+            db_path=_esc(self.db_path),
+            domain_chart=domain_chart,
+        )
 
 
 def main():
@@ -6,10 +6,49 @@ This tool helps you explore and analyze the crawler database.
 """
 
 import sqlite3
+import sys
 import argparse
 import json
+import os
+import time
 from pathlib import Path
 from datetime import datetime
+from typing import List
+
+from url_utils import extract_domain
+
+# Use orjson for faster JSON encoding/decoding when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_dumps(obj, indent: bool = False) -> bytes:
+    """Serialize an object to UTF-8 JSON bytes (orjson when available)."""
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+_json_loads = orjson.loads if orjson else json.loads
+
+# Sessions with fewer pages are exported with one in-memory dump instead of streaming
+SMALL_EXPORT_PAGES = 1000
+
+_EXPORT_PAGES_SQL = """
+    SELECT url, title, status_code, content_type, content_length, 
+           response_time, timestamp, extracted_data
+    FROM pages WHERE session_id = ?
+    ORDER BY timestamp
+"""
+
+_EXPORT_ERRORS_SQL = """
+    SELECT url, error_type, error_message, timestamp
+    FROM errors WHERE session_id = ?
+    ORDER BY timestamp
+"""
 
 
 def connect_database(db_path: str):
@@ -21,12 +60,29 @@ def connect_database(db_path: str):
     try:
         conn = sqlite3.connect(db_path)
         conn.row_factory = sqlite3.Row  # Enable column access by name
+        conn.execute("PRAGMA cache_size = -65536")  # 64 MB page cache
+        conn.create_function("extract_domain", 1, extract_domain, deterministic=True)
         return conn
     except Exception as e:
         print(f"❌ Error connecting to database: {e}")
         return None
 
 
+def _format_ts(ts: float, fmt: str = "%Y-%m-%d %H:%M:%S") -> str:
+    """Format a Unix timestamp in local time without building a datetime object."""
+    return time.strftime(fmt, time.localtime(ts))
+
+
+def _write_lines(lines: List[str]):
+    """Write collected output lines to stdout in a single call."""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _has_column(conn, table: str, column: str) -> bool:
+    """Check whether a table has the given column."""
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
 def list_sessions(conn):
     """List all crawling sessions."""
     cursor = conn.execute("""
@@ -42,28 +98,32 @@ def list_sessions(conn):
         print("No crawling sessions found.")
         return
     
-    print("\n[SESSIONS] CRAWLING SESSIONS")
-    print("=" * 80)
+    # Collect the listing and write it once instead of a print() per line
+    out: List[str] = []
+    out.append("\n[SESSIONS] CRAWLING SESSIONS")
+    out.append("=" * 80)
     for session in sessions:
-        start_time = datetime.fromtimestamp(session['started_at']).strftime("%Y-%m-%d %H:%M:%S") if session['started_at'] else "Unknown"
+        start_time = _format_ts(session['started_at']) if session['started_at'] else "Unknown"
         end_time = "In Progress"
         if session['completed_at']:
-            end_time = datetime.fromtimestamp(session['completed_at']).strftime("%Y-%m-%d %H:%M:%S")
+            end_time = _format_ts(session['completed_at'])
         
-        print(f"Session ID: {session['id']}")
-        print(f"Start URL: {session['start_url']}")
-        print(f"Start Time: {start_time}")
-        print(f"End Time: {end_time}")
-        print(f"Settings: depth={session['max_depth']}, max_pages={session['max_pages']}")
-        print(f"Results: pages={session['pages_crawled'] or 0}, errors={session['total_errors'] or 0}")
-        print("-" * 80)
+        out.append(f"Session ID: {session['id']}")
+        out.append(f"Start URL: {session['start_url']}")
+        out.append(f"Start Time: {start_time}")
+        out.append(f"End Time: {end_time}")
+        out.append(f"Settings: depth={session['max_depth']}, max_pages={session['max_pages']}")
+        out.append(f"Results: pages={session['pages_crawled'] or 0}, errors={session['total_errors'] or 0}")
+        out.append("-" * 80)
+    
+    _write_lines(out)
 
 
 def show_session_details(conn, session_id):
     """Show detailed information about a specific session."""
     # Session info
     cursor = conn.execute("""
-        SELECT * FROM crawl_sessions WHERE session_id = ?
+        SELECT * FROM crawl_sessions WHERE id = ?
     """, (session_id,))
     session = cursor.fetchone()
     
@@ -71,21 +131,22 @@ def show_session_details(conn, session_id):
         print(f"❌ Session {session_id} not found.")
         return
     
-    print(f"\n📊 SESSION {session_id} DETAILS")
-    print("=" * 60)
+    out: List[str] = []
+    out.append(f"\n📊 SESSION {session_id} DETAILS")
+    out.append("=" * 60)
     
-    start_time = datetime.fromtimestamp(session['start_time']).strftime("%Y-%m-%d %H:%M:%S")
+    start_time = _format_ts(session['started_at']) if session['started_at'] else "Unknown"
     end_time = "In Progress"
-    if session['end_time']:
-        end_time = datetime.fromtimestamp(session['end_time']).strftime("%Y-%m-%d %H:%M:%S")
+    if session['completed_at']:
+        end_time = _format_ts(session['completed_at'])
     
-    print(f"Start URL: {session['start_url']}")
-    print(f"Start Time: {start_time}")
-    print(f"End Time: {end_time}")
-    print(f"Max Depth: {session['max_depth']}")
-    print(f"Max Pages: {session['max_pages']}")
-    print(f"Pages Crawled: {session['pages_crawled'] or 0}")
-    print(f"Errors: {session['errors_occurred'] or 0}")
+    out.append(f"Start URL: {session['start_url']}")
+    out.append(f"Start Time: {start_time}")
+    out.append(f"End Time: {end_time}")
+    out.append(f"Max Depth: {session['max_depth']}")
+    out.append(f"Max Pages: {session['max_pages']}")
+    out.append(f"Pages Crawled: {session['pages_crawled'] or 0}")
+    out.append(f"Errors: {session['total_errors'] or 0}")
     
     # Pages statistics
     cursor = conn.execute("""
@@ -97,27 +158,31 @@ def show_session_details(conn, session_id):
     
     stats = cursor.fetchone()
     if stats['total'] > 0:
-        print(f"\n📄 PAGES STATISTICS")
-        print(f"Total Pages: {stats['total']}")
-        print(f"Average Response Time: {stats['avg_response_time']:.2f}s")
-        print(f"Total Bytes: {stats['total_bytes']:,} bytes ({stats['total_bytes']/(1024*1024):.2f} MB)")
+        out.append(f"\n📄 PAGES STATISTICS")
+        out.append(f"Total Pages: {stats['total']}")
+        out.append(f"Average Response Time: {stats['avg_response_time']:.2f}s")
+        out.append(f"Total Bytes: {stats['total_bytes']:,} bytes ({stats['total_bytes']/(1024*1024):.2f} MB)")
     
-    # Domain breakdown
-    cursor = conn.execute("""
-        SELECT 
-            SUBSTR(url, 1, INSTR(url, '/', 8) - 1) as domain,
-            COUNT(*) as page_count
+    # Domain breakdown (databases written before pages.domain existed
+    # derive it from the URL)
+    if _has_column(conn, 'pages', 'domain'):
+        domain_sql = "domain"
+    else:
+        domain_sql = "extract_domain(url)"
+    cursor = conn.execute(f"""
+        SELECT {domain_sql} as domain, COUNT(*) as page_count
         FROM pages 
         WHERE session_id = ? 
-        GROUP BY domain
+        GROUP BY 1
         ORDER BY page_count DESC
+        LIMIT 10
     """, (session_id,))
     
     domains = cursor.fetchall()
     if domains:
-        print(f"\n🌐 DOMAINS CRAWLED")
-        for domain in domains[:10]:  # Show top 10
-            print(f"  {domain['domain']}: {domain['page_count']} pages")
+        out.append(f"\n🌐 DOMAINS CRAWLED")
+        for domain in domains:  # Top 10
+            out.append(f"  {domain['domain']}: {domain['page_count']} pages")
     
     # Recent errors
     cursor = conn.execute("""
@@ -130,65 +195,106 @@ def show_session_details(conn, session_id):
     
     errors = cursor.fetchall()
     if errors:
-        print(f"\n❌ RECENT ERRORS")
+        out.append(f"\n❌ RECENT ERRORS")
         for error in errors:
-            timestamp = datetime.fromtimestamp(error['timestamp']).strftime("%H:%M:%S")
-            print(f"  [{timestamp}] {error['error_type']}: {error['url']}")
+            timestamp = _format_ts(error['timestamp'], "%H:%M:%S")
+            out.append(f"  [{timestamp}] {error['error_type']}: {error['url']}")
             if error['error_message']:
-                print(f"    └─ {error['error_message'][:100]}")
+                out.append(f"    └─ {error['error_message'][:100]}")
+    
+    _write_lines(out)
+
+
+def _iter_records(conn, sql: str, params: tuple):
+    """Yield query rows as dicts, zipping plain tuples with column names captured once."""
+    cursor = conn.cursor()
+    cursor.row_factory = None  # Plain tuples are cheaper than sqlite3.Row
+    cursor.execute(sql, params)
+    columns = tuple(column[0] for column in cursor.description)
+    for row in cursor:
+        yield dict(zip(columns, row))
+
+
+def _page_record(record: dict) -> dict:
+    """Decode a page record's extracted_data JSON in place."""
+    if record['extracted_data']:
+        try:
+            record['extracted_data'] = _json_loads(record['extracted_data'])
+        except ValueError:
+            pass  # Keep as string if parsing fails
+    return record
+
+
+def _encode_records(records):
+    """Lazily encode records; each row is fetched from SQLite only as the writer consumes it."""
+    for record in records:
+        yield _json_dumps(record)
+
+
+def _write_json_rows(f, records) -> int:
+    """Write records to an open file as JSON array items; returns the record count."""
+    count = 0
+    for encoded in _encode_records(records):
+        f.write(b",\n    " if count else b"\n    ")
+        f.write(encoded)
+        count += 1
+    if count:
+        f.write(b"\n  ")
+    return count
 
 
 def export_session_data(conn, session_id, output_file):
-    """Export session data to JSON."""
+    """Export session data to JSON, streaming pages and errors for large sessions."""
     try:
         # Get session info
-        cursor = conn.execute("SELECT * FROM crawl_sessions WHERE session_id = ?", (session_id,))
+        cursor = conn.execute("SELECT * FROM crawl_sessions WHERE id = ?", (session_id,))
         session = cursor.fetchone()
         
         if not session:
             print(f"❌ Session {session_id} not found.")
             return
         
-        # Get all pages
-        cursor = conn.execute("""
-            SELECT url, title, status_code, content_type, content_length, 
-                   response_time, timestamp, extracted_data
-            FROM pages WHERE session_id = ?
-            ORDER BY timestamp
-        """, (session_id,))
-        pages = cursor.fetchall()
-        
-        # Get all errors
-        cursor = conn.execute("""
-            SELECT url, error_type, error_message, timestamp
-            FROM errors WHERE session_id = ?
-            ORDER BY timestamp
-        """, (session_id,))
-        errors = cursor.fetchall()
-        
-        # Build export data
-        export_data = {
-            'session_info': dict(session),
-            'pages': [dict(row) for row in pages],
-            'errors': [dict(row) for row in errors],
-            'export_timestamp': datetime.now().isoformat()
-        }
+        total_pages = conn.execute(
+            "SELECT COUNT(*) FROM pages WHERE session_id = ?", (session_id,)
+        ).fetchone()[0]
         
-        # Convert extracted_data JSON strings back to objects
-        for page in export_data['pages']:
-            if page['extracted_data']:
-                try:
-                    page['extracted_data'] = json.loads(page['extracted_data'])
-                except:
-                    pass  # Keep as string if parsing fails
-        
-        # Write to file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        if total_pages < SMALL_EXPORT_PAGES:
+            # Small export: a single dump and write is cheaper than many small writes
+            export_data = {
+                'session_info': dict(session),
+                'pages': list(map(_page_record, _iter_records(conn, _EXPORT_PAGES_SQL, (session_id,)))),
+                'errors': list(_iter_records(conn, _EXPORT_ERRORS_SQL, (session_id,))),
+                'export_timestamp': datetime.now().isoformat()
+            }
+            with open(output_file, 'wb') as f:
+                f.write(_json_dumps(export_data, indent=True))
+            page_count = len(export_data['pages'])
+            error_count = len(export_data['errors'])
+        else:
+            with open(output_file, 'wb') as f:
+                if hasattr(os, 'posix_fadvise'):
+                    # Output is written strictly front to back
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                f.write(b'{\n  "session_info": ')
+                f.write(_json_dumps(dict(session)))
+                
+                # Stream all pages
+                f.write(b',\n  "pages": [')
+                page_count = _write_json_rows(
+                    f, map(_page_record, _iter_records(conn, _EXPORT_PAGES_SQL, (session_id,))))
+                
+                # Stream all errors
+                f.write(b'],\n  "errors": [')
+                error_count = _write_json_rows(
+                    f, _iter_records(conn, _EXPORT_ERRORS_SQL, (session_id,)))
+                
+                f.write(b'],\n  "export_timestamp": ')
+                f.write(_json_dumps(datetime.now().isoformat()))
+                f.write(b'\n}\n')
         
         print(f"✅ Session {session_id} data exported to: {output_file}")
-        print(f"   📄 Pages: {len(export_data['pages'])}")
-        print(f"   ❌ Errors: {len(export_data['errors'])}")
+        print(f"   📄 Pages: {page_count}")
+        print(f"   ❌ Errors: {error_count}")
         
     except Exception as e:
         print(f"❌ Export failed: {e}")
@@ -205,13 +311,19 @@ def query_pages(conn, session_id=None, domain=None, limit=10):
         params.append(session_id)
     
     if domain:
-        conditions.append("url LIKE ?")
-        params.append(f"%{domain}%")
+        if _has_column(conn, 'pages', 'domain'):
+            conditions.append("domain = ?")
+            params.append(domain)
+        else:
+            # Databases written before pages.domain existed
+            conditions.append("url LIKE ?")
+            params.append(f"%{domain}%")
     
     if conditions:
         sql += " WHERE " + " AND ".join(conditions)
     
-    sql += f" ORDER BY timestamp DESC LIMIT {limit}"
+    sql += " ORDER BY timestamp DESC LIMIT ?"
+    params.append(limit)
     
     cursor = conn.execute(sql, params)
     pages = cursor.fetchall()
@@ -220,15 +332,18 @@ def query_pages(conn, session_id=None, domain=None, limit=10):
         print("📭 No pages found matching criteria.")
         return
     
-    print(f"\n📄 PAGES ({len(pages)} results)")
-    print("=" * 80)
+    out: List[str] = []
+    out.append(f"\n📄 PAGES ({len(pages)} results)")
+    out.append("=" * 80)
     for page in pages:
-        timestamp = datetime.fromtimestamp(page['timestamp']).strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = _format_ts(page['timestamp'])
         title = page['title'][:50] + "..." if len(page['title']) > 50 else page['title']
-        print(f"[{timestamp}] {page['status_code']} - {title}")
-        print(f"   URL: {page['url']}")
-        print(f"   Type: {page['content_type']}")
-        print("-" * 40)
+        out.append(f"[{timestamp}] {page['status_code']} - {title}")
+        out.append(f"   URL: {page['url']}")
+        out.append(f"   Type: {page['content_type']}")
+        out.append("-" * 40)
+    
+    _write_lines(out)
 
 
 def main():
@@ -3,17 +3,22 @@
 Fix Database Integration - Replace DatabaseManager with simplified version
 """
 
-import os
+import ast
+from pathlib import Path
 
-# Read the current crawler.py file
-with open('crawler.py', 'r', encoding='utf-8') as f:
-    content = f.read()
+# Read and parse the current crawler.py file once
+crawler_path = Path('crawler.py')
+content = crawler_path.read_text(encoding='utf-8')
+lines = content.splitlines(keepends=True)
 
-# Find and replace the DatabaseManager class
-class_start = content.find('class DatabaseManager:')
-class_end = content.find('\nclass WebCrawler:')
+# Locate the DatabaseManager class by its AST node instead of text markers
+class_node = next(
+    (node for node in ast.parse(content).body
+     if isinstance(node, ast.ClassDef) and node.name == 'DatabaseManager'),
+    None
+)
 
-if class_start != -1 and class_end != -1:
+if class_node is not None:
     # New simplified DatabaseManager
     new_db_manager = '''class DatabaseManager:
     """
@@ -165,14 +170,20 @@ if class_start != -1 and class_end != -1:
 
 '''
 
-    # Replace the class
-    new_content = content[:class_start] + new_db_manager + content[class_end:]
+    # Replace the class's exact line span (the blank lines after it are kept)
+    class_start = class_node.lineno - 1
+    class_end = class_node.end_lineno
+    new_class = new_db_manager.rstrip('\n') + '\n'
     
-    # Write back to file
-    with open('crawler.py', 'w', encoding='utf-8') as f:
-        f.write(new_content)
-    
-    print("✅ DatabaseManager class has been simplified and fixed!")
+    if ''.join(lines[class_start:class_end]) == new_class:
+        print("✅ DatabaseManager class is already up to date")
+    else:
+        new_content = ''.join(lines[:class_start]) + new_class + ''.join(lines[class_end:])
+        
+        # Write back to file
+        crawler_path.write_text(new_content, encoding='utf-8')
+        
+        print("✅ DatabaseManager class has been simplified and fixed!")
     
 else:
-    print("❌ Could not find DatabaseManager class boundaries")
\ No newline at end of file
+    print("❌ Could not find DatabaseManager class")
@@ -6,60 +6,220 @@ Adds full-text search capabilities to the crawler database.
 
 import sqlite3
 import json
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 import logging
 
+from url_utils import extract_domain
+
+
+def _fts_values(row: str) -> str:
+    """Column list for a pages_fts row built from a pages row alias."""
+    return (f"{row}.id, COALESCE({row}.title, ''), "
+            f"COALESCE({row}.content_text, ''), "
+            f"COALESCE({row}.domain, '')")
+
+
+# External-content FTS5 table over pages; the text lives in pages only, and
+# the column names match pages so FTS5 can read rows back when it needs to.
+# The prefix indexes let 'pyth*' style queries use the index directly.
+_FTS_TABLE_SQL = """CREATE VIRTUAL TABLE pages_fts USING fts5(
+                            title,
+                            content_text,
+                            domain,
+                            content='pages',
+                            content_rowid='id',
+                            prefix='2 3 4',
+                            tokenize='porter unicode61'
+                        )"""
+
+# Only pages with extracted_data are indexed, so deletes are guarded the same
+# way - an external-content 'delete' must match exactly what was inserted
+_FTS_TRIGGERS = {
+    'pages_fts_ai': f"""
+        CREATE TRIGGER pages_fts_ai AFTER INSERT ON pages
+        WHEN new.extracted_data IS NOT NULL BEGIN
+            INSERT INTO pages_fts (rowid, title, content_text, domain)
+            SELECT {_fts_values('new')};
+        END""",
+    'pages_fts_ad': f"""
+        CREATE TRIGGER pages_fts_ad AFTER DELETE ON pages
+        WHEN old.extracted_data IS NOT NULL BEGIN
+            INSERT INTO pages_fts (pages_fts, rowid, title, content_text, domain)
+            SELECT 'delete', {_fts_values('old')};
+        END""",
+    'pages_fts_au': f"""
+        CREATE TRIGGER pages_fts_au AFTER UPDATE ON pages BEGIN
+            INSERT INTO pages_fts (pages_fts, rowid, title, content_text, domain)
+            SELECT 'delete', {_fts_values('old')} WHERE old.extracted_data IS NOT NULL;
+            INSERT INTO pages_fts (rowid, title, content_text, domain)
+            SELECT {_fts_values('new')} WHERE new.extracted_data IS NOT NULL;
+        END""",
+}
+
+
+# Characters with meaning in FTS5 query syntax; user input is reduced to
+# plain quoted terms so it can never produce a MATCH syntax error
+_FTS_SPECIAL = re.compile(r'["*():^+{}-]')
+
+
+def _sanitize_fts(term: str) -> str:
+    """Quote one search term for MATCH; a trailing * still means prefix search."""
+    text = _FTS_SPECIAL.sub(' ', term).strip()
+    if not text:
+        return ''
+    return f'"{text}"*' if term.endswith('*') else f'"{text}"'
+
+
+@lru_cache(maxsize=256)
+def _build_match_expr(query: str) -> str:
+    """Build an FTS5 MATCH expression requiring every term of the query."""
+    return ' AND '.join(filter(None, map(_sanitize_fts, query.split())))
+
+
+# Search orderings: (sort column, result field, keyset comparison, direction).
+# Ties are broken on p.id so a (value, id) cursor identifies one position.
+_SEARCH_ORDERS = {
+    'date': ('p.timestamp', 'timestamp', '<', 'DESC'),
+    'rank': ('pages_fts.rank', 'rank', '>', 'ASC'),
+}
+
+
 class SearchDatabase:
     """Enhanced database manager with full-text search capabilities."""
     
+    # Per-connection settings; journal_mode is persistent and set once in __init__
+    CONNECTION_PRAGMAS = (
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA cache_size=-65536",
+    )
+    
+    # Maximum number of cached search result pages
+    _CACHE_MAX = 256
+    
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self._local = threading.local()
+        self._cache_lock = threading.Lock()
+        self._result_cache = OrderedDict()
+        self._filter_options_cache = None
+        # Read-only connection used to watch PRAGMA data_version, which
+        # changes whenever another connection (e.g. the crawler) commits
+        self._version_conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                             isolation_level=None)
+        self._data_version = None
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
         self.setup_search_tables()
     
+    def _get_conn(self) -> sqlite3.Connection:
+        """Return this thread's long-lived connection, creating it on first use.
+        
+        Keeping the connection open keeps its prepared-statement cache warm
+        across searches. It runs in autocommit mode; writes use explicit
+        BEGIN/COMMIT.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                   isolation_level=None, cached_statements=512)
+            for pragma in self.CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            conn.create_function("extract_domain", 1, extract_domain, deterministic=True)
+            self._local.conn = conn
+        return conn
+    
+    def _invalidate_if_changed(self):
+        """Drop cached results and filter options if the database changed."""
+        with self._cache_lock:
+            version = self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._data_version:
+                self._data_version = version
+                self._result_cache.clear()
+                self._filter_options_cache = None
+    
+    def clear_cache(self):
+        """Forget cached search results and filter options.
+        
+        Pages never need adding to the search index by hand: the pages_fts
+        triggers index them as the crawler writes them, and writes from
+        other connections already drop the cache via PRAGMA data_version.
+        """
+        with self._cache_lock:
+            self._result_cache.clear()
+            self._filter_options_cache = None
+    
+    def close(self):
+        """Optimize and close the calling thread's connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.conn = None
+            try:
+                conn.execute("PRAGMA optimize")
+            finally:
+                conn.close()
+    
     def setup_search_tables(self):
         """Setup full-text search tables and indexes."""
         with sqlite3.connect(self.db_path) as conn:
+            conn.create_function("extract_domain", 1, extract_domain, deterministic=True)
             cursor = conn.cursor()
             
+            # Persist the URL host as an indexed column so searches and
+            # filters don't recompute it per row. The crawler fills it in
+            # on save; older rows are backfilled here.
+            cursor.execute("PRAGMA table_info(pages)")
+            columns = {row[1] for row in cursor.fetchall()}
+            if 'domain' not in columns:
+                cursor.execute("ALTER TABLE pages ADD COLUMN domain TEXT")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_pages_domain_ts ON pages(domain, timestamp DESC)")
+            cursor.execute("UPDATE pages SET domain = extract_domain(url) WHERE domain IS NULL")
+            
+            # Same for the page text, which otherwise needs a json_extract()
+            # of extracted_data on every row a search touches
+            if 'content_text' not in columns:
+                cursor.execute("ALTER TABLE pages ADD COLUMN content_text TEXT")
+                cursor.execute("""
+                    UPDATE pages SET content_text = json_extract(extracted_data, '$.text_content')
+                    WHERE extracted_data IS NOT NULL
+                """)
+            
             # Enable FTS5 if not already enabled
             try:
-                cursor.execute("SELECT * FROM sqlite_master WHERE type='table' AND name='pages_fts'")
-                if not cursor.fetchone():
-                    # Create FTS5 virtual table for content search
-                    cursor.execute("""
-                        CREATE VIRTUAL TABLE pages_fts USING fts5(
-                            url,
-                            title,
-                            content,
-                            domain,
-                            tokenize='porter'
-                        )
-                    """)
+                cursor.execute("""
+                    SELECT name, sql FROM sqlite_master
+                    WHERE name = 'pages_fts' OR (type = 'trigger' AND name LIKE 'pages_fts_%')
+                """)
+                current = {name: ' '.join(sql.split()) for name, sql in cursor.fetchall()}
+                wanted = {name: ' '.join(sql.split())
+                          for name, sql in (('pages_fts', _FTS_TABLE_SQL), *_FTS_TRIGGERS.items())}
+                if current != wanted:
+                    # (Re)create the external-content FTS5 table; rows are keyed
+                    # by pages.id so searches join on rowid. The triggers are
+                    # part of the check because a 'delete' has to match how
+                    # the row was indexed, so the index is rebuilt with them.
+                    for name in _FTS_TRIGGERS:
+                        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+                    cursor.execute("DROP TABLE IF EXISTS pages_fts")
+                    cursor.execute(_FTS_TABLE_SQL)
                     
                     # Populate FTS table with existing data
-                    cursor.execute("""
-                        INSERT INTO pages_fts (url, title, content, domain)
-                        SELECT 
-                            url,
-                            COALESCE(title, ''),
-                            COALESCE(json_extract(extracted_data, '$.text_content'), ''),
-                            CASE 
-                                WHEN url LIKE 'http://%' THEN 
-                                    CASE 
-                                        WHEN instr(substr(url, 8), '/') = 0 THEN substr(url, 8)
-                                        ELSE substr(url, 8, instr(substr(url, 8), '/') - 1)
-                                    END
-                                WHEN url LIKE 'https://%' THEN 
-                                    CASE 
-                                        WHEN instr(substr(url, 9), '/') = 0 THEN substr(url, 9)
-                                        ELSE substr(url, 9, instr(substr(url, 9), '/') - 1)
-                                    END
-                                ELSE url
-                            END as domain
+                    cursor.execute(f"""
+                        INSERT INTO pages_fts (rowid, title, content_text, domain)
+                        SELECT {_fts_values('pages')}
                         FROM pages 
                         WHERE extracted_data IS NOT NULL
                     """)
                     
+                    # Keep the index in sync with pages; the crawler's upsert
+                    # fires the UPDATE trigger, which swaps the old entry out
+                    for sql in _FTS_TRIGGERS.values():
+                        cursor.execute(sql)
+                    
                     print("✅ Full-text search index created and populated")
                 
             except sqlite3.OperationalError as e:
@@ -76,10 +236,17 @@ class SearchDatabase:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_pages_content_type ON pages(content_type)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_pages_status_code ON pages(status_code)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_pages_content_length ON pages(content_length)")
+            # LIKE is case-insensitive, so prefix lookups need NOCASE indexes
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_pages_title ON pages(title COLLATE NOCASE)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_pages_domain_nocase ON pages(domain COLLATE NOCASE)")
             
             conn.commit()
+            
+            # Give the planner statistics for the new indexes
+            cursor.execute("ANALYZE")
     
-    def search_content(self, query: str, filters: dict = None, limit: int = 100, offset: int = 0):
+    def search_content(self, query: str, filters: dict = None, limit: int = 100, offset: int = 0,
+                       sort: str = 'relevance', cursor: tuple = None):
         """
         Search through crawled content with advanced filters.
         
@@ -88,165 +255,168 @@ class SearchDatabase:
             filters: Dictionary of filters (domain, date_range, content_type, etc.)
             limit: Maximum results to return
             offset: Results offset for pagination
+            sort: 'relevance' (BM25 rank) or 'date' (newest first); queries
+                without FTS matching are always sorted by date
+            cursor: 'next_cursor' from a previous page; continues after that
+                row instead of skipping offset rows. total_count then counts
+                the results from the cursor on.
             
         Returns:
             Dictionary with results and metadata
         """
         filters = filters or {}
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Build search query based on FTS availability
-            if self.fts_available and query.strip():
-                return self._search_with_fts(cursor, query, filters, limit, offset)
-            else:
-                return self._search_with_like(cursor, query, filters, limit, offset)
+        # Pagination and repeated queries hit the same keys; serve them from
+        # the LRU cache until the database changes
+        self._invalidate_if_changed()
+        after = tuple(cursor) if cursor else None
+        key = (query, json.dumps(filters, sort_keys=True), limit, offset, sort, after)
+        with self._cache_lock:
+            if key in self._result_cache:
+                self._result_cache.move_to_end(key)
+                return self._result_cache[key]
+        
+        db_cursor = self._get_conn().cursor()
+        
+        # Build search query based on FTS availability
+        if self.fts_available and _build_match_expr(query):
+            result = self._search_with_fts(db_cursor, query, filters, limit, offset, sort, after)
+        else:
+            result = self._search_with_like(db_cursor, query, filters, limit, offset, after)
+        
+        with self._cache_lock:
+            self._result_cache[key] = result
+            if len(self._result_cache) > self._CACHE_MAX:
+                self._result_cache.popitem(last=False)
+        return result
     
-    def _search_with_fts(self, cursor, query: str, filters: dict, limit: int, offset: int):
-        """Search using FTS5 full-text search."""
-        # Simple FTS search first
-        fts_query = """
-            SELECT 
-                fts.url,
-                fts.title,
-                fts.content,
-                fts.domain
-            FROM pages_fts fts
-            WHERE fts MATCH ?
+    @staticmethod
+    def _collect_results(cursor):
         """
+        Turn an executed search cursor into (results, total_count).
         
-        # Get page data and join with FTS results
-        base_query = """
-            SELECT 
-                p.url,
-                p.title,
-                p.status_code,
-                p.content_type,
-                p.content_length,
-                p.response_time,
-                p.timestamp,
-                p.extracted_data,
-                0 as rank,
-                CASE 
-                    WHEN p.url LIKE 'http://%' THEN 
-                        CASE 
-                            WHEN instr(substr(p.url, 8), '/') = 0 THEN substr(p.url, 8)
-                            ELSE substr(p.url, 8, instr(substr(p.url, 8), '/') - 1)
-                        END
-                    WHEN p.url LIKE 'https://%' THEN 
-                        CASE 
-                            WHEN instr(substr(p.url, 9), '/') = 0 THEN substr(p.url, 9)
-                            ELSE substr(p.url, 9, instr(substr(p.url, 9), '/') - 1)
-                        END
-                    ELSE p.url
-                END as domain
-            FROM pages p
-            WHERE p.url IN (
-                SELECT url FROM pages_fts WHERE pages_fts MATCH ?
-            )
+        The last column is the COUNT(*) OVER () window total, which is
+        read from the first row and left out of the result dicts.
         """
+        cols = tuple(d[0] for d in cursor.description[:-1])
+        total_count = 0
+        results = []
+        for row in cursor:
+            total_count = row[-1]
+            results.append(dict(zip(cols, row)))
+        return results, total_count
+    
+    def _fetch_page(self, cursor, base_query: str, params: dict, order: str, query: str,
+                    filters: dict, limit: int, offset: int, after: tuple = None):
+        """
+        Order, paginate and run a search query, returning the result payload.
         
-        params = [query]
-        where_clauses = []
-        
-        # Add filters
-        if filters.get('domains'):
-            domain_placeholders = ','.join('?' * len(filters['domains']))
-            where_clauses.append(f"domain IN ({domain_placeholders})")
-            params.extend(filters['domains'])
-        
-        if filters.get('date_from'):
-            where_clauses.append("p.timestamp >= ?")
-            params.append(filters['date_from'])
-            
-        if filters.get('date_to'):
-            where_clauses.append("p.timestamp <= ?")
-            params.append(filters['date_to'])
-        
-        if filters.get('content_types'):
-            type_placeholders = ','.join('?' * len(filters['content_types']))
-            where_clauses.append(f"p.content_type IN ({type_placeholders})")
-            params.extend(filters['content_types'])
-        
-        if filters.get('min_length'):
-            where_clauses.append("p.content_length >= ?")
-            params.append(filters['min_length'])
-            
-        if filters.get('max_length'):
-            where_clauses.append("p.content_length <= ?")
-            params.append(filters['max_length'])
-        
-        # Add WHERE clauses
-        if where_clauses:
-            base_query += " AND " + " AND ".join(where_clauses)
-        
-        # Add ordering and pagination
-        base_query += " ORDER BY p.timestamp DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
+        With after=(sort value, page id) the page starts right after that
+        row, which an index can seek to, instead of discarding offset rows.
+        """
+        column, field, op, direction = _SEARCH_ORDERS[order]
+        if after is not None:
+            base_query += (f" AND ({column} {op} :after_key"
+                           f" OR ({column} = :after_key AND p.id {op} :after_id))")
+            params.update(after_key=after[0], after_id=after[1])
+            offset = 0
+        base_query += f" ORDER BY {column} {direction}, p.id {direction} LIMIT :limit OFFSET :offset"
+        params.update(limit=limit, offset=offset)
         
         # Execute search
         cursor.execute(base_query, params)
-        results = [dict(row) for row in cursor.fetchall()]
+        results, total_count = self._collect_results(cursor)
         
-        # Get total count for pagination - simplified
-        count_query = """
-            SELECT COUNT(*)
-            FROM pages p
-            WHERE p.url IN (
-                SELECT url FROM pages_fts WHERE pages_fts MATCH ?
-            )
+        has_next = offset + limit < total_count
+        return {
+            'results': results,
+            'total_count': total_count,
+            'query': query,
+            'filters': filters,
+            'has_next': has_next,
+            'has_prev': offset > 0 or after is not None,
+            'next_cursor': (results[-1][field], results[-1]['id']) if has_next else None
+        }
+    
+    @staticmethod
+    def _build_filters(filters: dict):
+        """
+        Build the filter part of a search WHERE clause.
+        
+        Returns:
+            (sql, params) where sql is "" or starts with " AND " and params
+            is a dict of named parameters for it
         """
-        count_params = [query]
+        clauses = []
+        params = {}
         
-        # Add filters for count query
-        filter_clauses = []
         if filters.get('domains'):
-            domain_placeholders = ','.join('?' * len(filters['domains']))
-            filter_clauses.append(f"CASE WHEN p.url LIKE 'http://%' THEN CASE WHEN instr(substr(p.url, 8), '/') = 0 THEN substr(p.url, 8) ELSE substr(p.url, 8, instr(substr(p.url, 8), '/') - 1) END WHEN p.url LIKE 'https://%' THEN CASE WHEN instr(substr(p.url, 9), '/') = 0 THEN substr(p.url, 9) ELSE substr(p.url, 9, instr(substr(p.url, 9), '/') - 1) END ELSE p.url END IN ({domain_placeholders})")
-            count_params.extend(filters['domains'])
+            names = [f":domain{i}" for i in range(len(filters['domains']))]
+            clauses.append(f"p.domain IN ({','.join(names)})")
+            params.update(zip((name[1:] for name in names), filters['domains']))
         
         if filters.get('date_from'):
-            filter_clauses.append("p.timestamp >= ?")
-            count_params.append(filters['date_from'])
+            clauses.append("p.timestamp >= :date_from")
+            params['date_from'] = filters['date_from']
             
         if filters.get('date_to'):
-            filter_clauses.append("p.timestamp <= ?")
-            count_params.append(filters['date_to'])
+            clauses.append("p.timestamp <= :date_to")
+            params['date_to'] = filters['date_to']
         
         if filters.get('content_types'):
-            type_placeholders = ','.join('?' * len(filters['content_types']))
-            filter_clauses.append(f"p.content_type IN ({type_placeholders})")
-            count_params.extend(filters['content_types'])
+            names = [f":content_type{i}" for i in range(len(filters['content_types']))]
+            clauses.append(f"p.content_type IN ({','.join(names)})")
+            params.update(zip((name[1:] for name in names), filters['content_types']))
         
         if filters.get('min_length'):
-            filter_clauses.append("p.content_length >= ?")
-            count_params.append(filters['min_length'])
+            clauses.append("p.content_length >= :min_length")
+            params['min_length'] = filters['min_length']
             
         if filters.get('max_length'):
-            filter_clauses.append("p.content_length <= ?")
-            count_params.append(filters['max_length'])
+            clauses.append("p.content_length <= :max_length")
+            params['max_length'] = filters['max_length']
         
-        if filter_clauses:
-            count_query += " AND " + " AND ".join(filter_clauses)
+        return (" AND " + " AND ".join(clauses)) if clauses else "", params
+    
+    def _search_with_fts(self, cursor, query: str, filters: dict, limit: int, offset: int,
+                         sort: str = 'relevance', after: tuple = None):
+        """Search using FTS5 full-text search."""
+        # Get page data by joining FTS matches on rowid
+        base_query = """
+            SELECT 
+                p.id,
+                p.url,
+                p.title,
+                p.status_code,
+                p.content_type,
+                p.content_length,
+                p.response_time,
+                p.timestamp,
+                p.content_text,
+                pages_fts.rank as rank,
+                p.domain,
+                COUNT(*) OVER () as total_count
+            FROM pages_fts
+            JOIN pages p ON p.id = pages_fts.rowid
+            WHERE pages_fts MATCH :query
+        """
         
-        cursor.execute(count_query, count_params)
-        total_count = cursor.fetchone()[0]
+        filter_sql, params = self._build_filters(filters)
+        base_query += filter_sql
+        params['query'] = _build_match_expr(query)
         
-        return {
-            'results': results,
-            'total_count': total_count,
-            'query': query,
-            'filters': filters,
-            'has_next': offset + limit < total_count,
-            'has_prev': offset > 0
-        }
+        # The hidden rank column is bm25() (lower is better) and, unlike the
+        # bm25() call, is allowed alongside the COUNT(*) OVER () window
+        order = 'date' if sort == 'date' else 'rank'
+        return self._fetch_page(cursor, base_query, params, order, query, filters,
+                                limit, offset, after)
     
-    def _search_with_like(self, cursor, query: str, filters: dict, limit: int, offset: int):
+    def _search_with_like(self, cursor, query: str, filters: dict, limit: int, offset: int,
+                          after: tuple = None):
         """Fallback search using LIKE queries."""
         base_query = """
             SELECT 
+                p.id,
                 p.url,
                 p.title,
                 p.status_code,
@@ -254,196 +424,107 @@ class SearchDatabase:
                 p.content_length,
                 p.response_time,
                 p.timestamp,
-                p.extracted_data,
+                p.content_text,
                 0 as rank,
-                CASE 
-                    WHEN p.url LIKE 'http://%' THEN 
-                        CASE 
-                            WHEN instr(substr(p.url, 8), '/') = 0 THEN substr(p.url, 8)
-                            ELSE substr(p.url, 8, instr(substr(p.url, 8), '/') - 1)
-                        END
-                    WHEN p.url LIKE 'https://%' THEN 
-                        CASE 
-                            WHEN instr(substr(p.url, 9), '/') = 0 THEN substr(p.url, 9)
-                            ELSE substr(p.url, 9, instr(substr(p.url, 9), '/') - 1)
-                        END
-                    ELSE p.url
-                END as domain
+                p.domain,
+                COUNT(*) OVER () as total_count
             FROM pages p
             WHERE 1=1
         """
         
-        params = []
-        where_clauses = []
+        # Add filters (same as FTS version)
+        filter_sql, params = self._build_filters(filters)
+        base_query += filter_sql
         
-        # Add search query
+        # Add search query; each term is matched once against the title,
+        # text and URL joined together rather than with three LIKEs
         if query.strip():
-            search_terms = query.strip().split()
             search_conditions = []
-            for term in search_terms:
+            for i, term in enumerate(query.split()):
                 search_conditions.append(
-                    "(p.title LIKE ? OR json_extract(p.extracted_data, '$.text_content') LIKE ? OR p.url LIKE ?)"
+                    f"(COALESCE(p.title, '') || ' ' || COALESCE(p.content_text, '') || ' ' || p.url) LIKE :term{i}"
                 )
-                like_term = f"%{term}%"
-                params.extend([like_term, like_term, like_term])
+                params[f"term{i}"] = f"%{term}%"
             
-            if search_conditions:
-                where_clauses.append("(" + " AND ".join(search_conditions) + ")")
+            base_query += " AND " + " AND ".join(search_conditions)
         
-        # Add filters (same as FTS version)
-        if filters.get('domains'):
-            domain_placeholders = ','.join('?' * len(filters['domains']))
-            where_clauses.append(f"domain IN ({domain_placeholders})")
-            params.extend(filters['domains'])
-        
-        if filters.get('date_from'):
-            where_clauses.append("p.timestamp >= ?")
-            params.append(filters['date_from'])
-            
-        if filters.get('date_to'):
-            where_clauses.append("p.timestamp <= ?")
-            params.append(filters['date_to'])
-        
-        if filters.get('content_types'):
-            type_placeholders = ','.join('?' * len(filters['content_types']))
-            where_clauses.append(f"p.content_type IN ({type_placeholders})")
-            params.extend(filters['content_types'])
-        
-        if filters.get('min_length'):
-            where_clauses.append("p.content_length >= ?")
-            params.append(filters['min_length'])
-            
-        if filters.get('max_length'):
-            where_clauses.append("p.content_length <= ?")
-            params.append(filters['max_length'])
-        
-        # Add WHERE clauses
-        if where_clauses:
-            base_query += " AND " + " AND ".join(where_clauses)
-        
-        # Add ordering and pagination
-        base_query += " ORDER BY p.timestamp DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
-        
-        # Execute search
-        cursor.execute(base_query, params)
-        results = [dict(row) for row in cursor.fetchall()]
-        
-        # Get total count
-        count_query = base_query.replace(
-            "SELECT p.url, p.title, p.status_code, p.content_type, p.content_length, p.response_time, p.timestamp, p.extracted_data, 0 as rank, CASE WHEN p.url LIKE 'http://%' THEN CASE WHEN instr(substr(p.url, 8), '/') = 0 THEN substr(p.url, 8) ELSE substr(p.url, 8, instr(substr(p.url, 8), '/') - 1) END WHEN p.url LIKE 'https://%' THEN CASE WHEN instr(substr(p.url, 9), '/') = 0 THEN substr(p.url, 9) ELSE substr(p.url, 9, instr(substr(p.url, 9), '/') - 1) END ELSE p.url END as domain",
-            "SELECT COUNT(*)"
-        ).replace(" ORDER BY p.timestamp DESC LIMIT ? OFFSET ?", "")
-        
-        cursor.execute(count_query, params[:-2])
-        total_count = cursor.fetchone()[0]
-        
-        return {
-            'results': results,
-            'total_count': total_count,
-            'query': query,
-            'filters': filters,
-            'has_next': offset + limit < total_count,
-            'has_prev': offset > 0
-        }
+        return self._fetch_page(cursor, base_query, params, 'date', query, filters,
+                                limit, offset, after)
     
     def get_search_suggestions(self, query_prefix: str, limit: int = 10):
-        """Get search suggestions based on existing content."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Get popular terms from titles and domains
-            cursor.execute("""
-                SELECT DISTINCT 
-                    CASE 
-                        WHEN title LIKE ? THEN title
-                        WHEN url LIKE ? THEN 
-                            CASE 
-                                WHEN url LIKE 'http://%' THEN substr(url, 8, instr(substr(url, 8), '/') - 1)
-                                WHEN url LIKE 'https://%' THEN substr(url, 9, instr(substr(url, 9), '/') - 1)
-                                ELSE url
-                            END
-                        ELSE NULL
-                    END as suggestion
-                FROM pages 
-                WHERE suggestion IS NOT NULL
-                ORDER BY suggestion
-                LIMIT ?
-            """, [f"%{query_prefix}%", f"%{query_prefix}%", limit])
-            
-            return [row[0] for row in cursor.fetchall()]
+        """Get search suggestions for titles and domains starting with a prefix."""
+        cursor = self._get_conn().cursor()
+        
+        # Prefix-only LIKE (no leading %) lets both arms range-scan their
+        # NOCASE indexes instead of scanning every page
+        cursor.execute("""
+            SELECT suggestion FROM (
+                SELECT * FROM (
+                    SELECT DISTINCT title AS suggestion FROM pages
+                    WHERE title LIKE :prefix ORDER BY title LIMIT :limit
+                )
+                UNION ALL
+                SELECT * FROM (
+                    SELECT DISTINCT domain FROM pages
+                    WHERE domain LIKE :prefix ORDER BY domain LIMIT :limit
+                )
+            )
+            ORDER BY suggestion
+            LIMIT :limit
+        """, {'prefix': f"{query_prefix}%", 'limit': limit})
+        
+        return [row[0] for row in cursor]
     
     def get_filter_options(self):
         """Get available filter options from the database."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Get unique domains
-            cursor.execute("""
-                SELECT DISTINCT 
-                    CASE 
-                        WHEN p.url LIKE 'http://%' THEN 
-                            CASE 
-                                WHEN instr(substr(p.url, 8), '/') = 0 THEN substr(p.url, 8)
-                                ELSE substr(p.url, 8, instr(substr(p.url, 8), '/') - 1)
-                            END
-                        WHEN p.url LIKE 'https://%' THEN 
-                            CASE 
-                                WHEN instr(substr(p.url, 9), '/') = 0 THEN substr(p.url, 9)
-                                ELSE substr(p.url, 9, instr(substr(p.url, 9), '/') - 1)
-                            END
-                        ELSE p.url
-                    END as domain
-                FROM pages 
-                WHERE domain IS NOT NULL
-                ORDER BY domain
-            """)
-            domains = [row[0] for row in cursor.fetchall()]
-            
-            # Get unique content types
-            cursor.execute("""
-                SELECT DISTINCT content_type
-                FROM pages 
-                WHERE content_type IS NOT NULL
-                ORDER BY content_type
-            """)
-            content_types = [row[0] for row in cursor.fetchall()]
-            
-            # Get date range
-            cursor.execute("""
-                SELECT 
-                    MIN(timestamp) as min_date,
-                    MAX(timestamp) as max_date,
-                    COUNT(*) as total_pages
-                FROM pages
-            """)
-            date_info = cursor.fetchone()
-            
-            return {
-                'domains': domains,
-                'content_types': content_types,
-                'date_range': {
-                    'min_date': date_info[0] if date_info[0] else 0,
-                    'max_date': date_info[1] if date_info[1] else 0,
-                    'total_pages': date_info[2] if date_info[2] else 0
-                }
+        # Only new pages change these, so reuse them until the data changes
+        self._invalidate_if_changed()
+        with self._cache_lock:
+            if self._filter_options_cache is not None:
+                return self._filter_options_cache
+        
+        cursor = self._get_conn().cursor()
+        
+        # Get unique domains
+        cursor.execute("""
+            SELECT DISTINCT domain
+            FROM pages 
+            WHERE domain IS NOT NULL
+            ORDER BY domain
+        """)
+        domains = [row[0] for row in cursor]
+        
+        # Get unique content types
+        cursor.execute("""
+            SELECT DISTINCT content_type
+            FROM pages 
+            WHERE content_type IS NOT NULL
+            ORDER BY content_type
+        """)
+        content_types = [row[0] for row in cursor]
+        
+        # Get date range
+        cursor.execute("""
+            SELECT 
+                MIN(timestamp) as min_date,
+                MAX(timestamp) as max_date,
+                COUNT(*) as total_pages
+            FROM pages
+        """)
+        date_info = cursor.fetchone()
+        
+        options = {
+            'domains': domains,
+            'content_types': content_types,
+            'date_range': {
+                'min_date': date_info[0] if date_info[0] else 0,
+                'max_date': date_info[1] if date_info[1] else 0,
+                'total_pages': date_info[2] if date_info[2] else 0
             }
-    
-    def add_page_to_search_index(self, url: str, title: str, content: str, domain: str):
-        """Add a single page to the search index (for new crawls)."""
-        if not self.fts_available:
-            return
-            
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            try:
-                cursor.execute("""
-                    INSERT OR REPLACE INTO pages_fts (url, title, content, domain)
-                    VALUES (?, ?, ?, ?)
-                """, (url, title or '', content or '', domain))
-                conn.commit()
-            except sqlite3.Error as e:
-                logging.warning(f"Failed to add page to search index: {e}")
+        }
+        with self._cache_lock:
+            self._filter_options_cache = options
+        return options
 
 
 def initialize_search_database(db_path: str = None):
@@ -108,6 +108,51 @@ def test_example_usage():
         print(f"Error: {stderr}")
         return False
 
+def test_search_index():
+    """Test that saved pages can be found through search."""
+    print("\n🔍 Testing search of saved pages...")
+    
+    from crawler import DatabaseManager
+    from search_database import SearchDatabase
+    
+    test_dir = Path("test_output/search_index")
+    shutil.rmtree(test_dir, ignore_errors=True)
+    test_dir.mkdir(parents=True)
+    test_db = str(test_dir / "crawler_data.db")
+    
+    try:
+        db_manager = DatabaseManager(test_db)
+        session_id = db_manager.start_session("https://example.com/", 1, 10)
+        db_manager.save_page(session_id, "https://example.com/first", "First page", "",
+                             200, "text/html", 100,
+                             extracted_data={'text_content': 'The first page mentions zebrafish.'})
+        db_manager.flush()
+        
+        search_db = SearchDatabase(test_db)
+        first = search_db.search_content("zebrafish")
+        
+        # Pages written after the search index was built are found too
+        db_manager.save_page(session_id, "https://example.com/second", "Second page", "",
+                             200, "text/html", 100,
+                             extracted_data={'text_content': 'More zebrafish on the second page.'})
+        db_manager.close()
+        second = search_db.search_content("zebrafish")
+        search_db.close()
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+    
+    first_urls = [row['url'] for row in first['results']]
+    second_urls = sorted(row['url'] for row in second['results'])
+    if first_urls != ["https://example.com/first"]:
+        print(f"❌ Search found {first_urls} instead of the saved page")
+        return False
+    if second_urls != ["https://example.com/first", "https://example.com/second"]:
+        print(f"❌ Search after a new save found {second_urls}")
+        return False
+    
+    print("✅ Saved pages are searchable!")
+    return True
+
 def main():
     """Run all tests."""
     print("🚀 Web Crawler Test Suite")
@@ -117,7 +162,8 @@ def main():
         ("Dependencies", test_dependencies),
         ("Crawler Help", test_crawler_help),
         ("Basic Crawl", test_basic_crawl),
-        ("Example Usage", test_example_usage)
+        ("Example Usage", test_example_usage),
+        ("Search Index", test_search_index)
     ]
     
     passed = 0
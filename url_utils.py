@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+URL Helpers
+Small dependency-free URL functions shared by the crawler, search and export modules.
+"""
+
+
+def extract_domain(url: str) -> str:
+    """Return the host part of an absolute URL, or '' when there is none."""
+    _, sep, rest = (url or '').partition('://')
+    if not sep:
+        return ''
+    # Plain str.partition calls are cheaper than a regex match or urlparse()
+    host = rest.partition('/')[0]
+    return host.partition('?')[0].partition('#')[0]
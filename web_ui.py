@@ -4,50 +4,227 @@ Web UI for the Web Crawler
 Provides a Flask-based web interface for managing and monitoring crawls
 """
 
+# eventlet must patch the stdlib before anything else imports socket/threading
+try:
+    import eventlet
+    eventlet.monkey_patch()
+    ASYNC_MODE = 'eventlet'
+except ImportError:
+    ASYNC_MODE = None
+
 import os
-import sys
-import json
+import re
+import signal
 import sqlite3
 import threading
-import subprocess
 import time
-from datetime import datetime, timedelta
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from datetime import datetime
+from flask import (Flask, Response, render_template, request, jsonify, redirect, url_for,
+                   flash, send_file, stream_with_context, g, has_app_context)
+from flask.json.provider import DefaultJSONProvider
 try:
-    from flask_socketio import SocketIO, emit
+    from flask_socketio import SocketIO
     SOCKETIO_AVAILABLE = True
 except ImportError:
     print("Warning: Flask-SocketIO not available. Real-time updates disabled.")
     SocketIO = None
-    emit = None
     SOCKETIO_AVAILABLE = False
-import queue
-from pathlib import Path
+try:
+    from flask_caching import Cache
+    CACHING_AVAILABLE = True
+except ImportError:
+    Cache = None
+    CACHING_AVAILABLE = False
+try:
+    from flask_compress import Compress
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    Compress = None
+    COMPRESS_AVAILABLE = False
+# Use orjson for faster JSON serialization when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Empty, Full
 
-# Import our existing crawler components
-from crawler import WebCrawler
-from data_exporter import DataExporter
+# Import our existing crawler components; WebCrawler and DataExporter are
+# imported where they are used so the UI starts without loading them
 from search_database import SearchDatabase
 # Note: database_explorer is a script, not a class, so we don't import it here
 
+def _clamp(value, lo, hi, default):
+    """Parse a request value as a number bounded to [lo, hi], or return default"""
+    try:
+        number = type(default)(value)
+    except (TypeError, ValueError):
+        return default
+    return max(lo, min(hi, number))
+
+@lru_cache(maxsize=256)
+def _snippet_pattern(query):
+    """Compile one case-insensitive alternation of a query's terms"""
+    terms = query.split()
+    if not terms:
+        return None
+    return re.compile('|'.join(map(re.escape, terms)), re.IGNORECASE)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes responses with orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default,
+                            option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # jsonify() goes through here; hand orjson's bytes straight to the
+        # response instead of decoding them to str and re-encoding
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS),
+            mimetype=self.mimetype
+        )
+
+class _OrjsonModule:
+    """json-module stand-in handed to Socket.IO for its packet encoding"""
+    
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        return orjson.loads(s)
+
+@dataclass(slots=True)
+class CrawlState:
+    """Progress of one web-started crawl; worker threads assign fields directly"""
+    url: str
+    max_pages: int
+    workers: int
+    delay: float
+    start_time: float
+    status: str = 'running'
+    pages_crawled: int = 0
+    pages_found: int = 0
+    errors: int = 0
+    current_url: str = ''
+    data_size: int = 0
+    end_time: float = None
+    error: str = None
+    
+    def to_dict(self):
+        return asdict(self)
+
 class CrawlerWebUI:
+    # Applied once to each pooled read connection
+    CONNECTION_PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA cache_size=-65536",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA temp_store=MEMORY",
+    )
+    
+    # Seconds between crawl_update pushes (5 Hz) and dashboard_stats pushes
+    PROGRESS_EMIT_INTERVAL = 0.2
+    STATS_EMIT_INTERVAL = 1.0
+    # Only this much of a page's text is scanned when building a snippet
+    SNIPPET_SCAN_LIMIT = 65536
+    
+    # Seconds a finished crawl stays visible in the monitor before it is dropped
+    FINISHED_CRAWL_TTL = 300
+    # Seconds a finished export stays downloadable before its file is deleted
+    FINISHED_EXPORT_TTL = 600
+    
+    # WHERE fragments for the results browser, keyed by filter name
+    RESULT_FILTERS = {
+        'after': "id < ?",
+        'before': "id > ?",
+        'domain': "domain = ?",
+        'session': "session_id = ?",
+    }
+    
+    RESULTS_PAGE_SQL = """
+        SELECT id, url, COALESCE(NULLIF(title, ''), 'No title') AS title, status_code,
+               COALESCE(content_length, 0) AS content_length, timestamp AS crawl_timestamp,
+               domain, COALESCE(response_time, 0) AS response_time
+        FROM pages {where}
+        ORDER BY id {order}
+        LIMIT ? OFFSET ?
+    """
+    
     def __init__(self):
         self.app = Flask(__name__)
         self.app.secret_key = 'web-crawler-secret-key-2025'
+        if orjson:
+            self.app.json = OrjsonProvider(self.app)
+        # gzip/brotli for JSON and HTML responses larger than 500 bytes
+        if COMPRESS_AVAILABLE:
+            Compress(self.app)
         
         if SOCKETIO_AVAILABLE:
-            self.socketio = SocketIO(self.app, cors_allowed_origins="*")
+            # A message queue (e.g. redis://localhost:6379/0) lets several workers
+            # share emits; without one Socket.IO stays in-process
+            self.socketio = SocketIO(
+                self.app,
+                cors_allowed_origins="*",
+                async_mode=ASYNC_MODE,
+                message_queue=os.environ.get('SOCKETIO_MESSAGE_QUEUE'),
+                json=_OrjsonModule if orjson else None
+            )
         else:
             self.socketio = None
         
+        # Short-lived cache for the aggregate queries every dashboard load and
+        # /api/stats poll would otherwise rerun; progress updates invalidate it
+        self.cache = None
+        self._last_stats_invalidation = 0.0
+        # Part of the cached results-total keys; bumped when a crawl finishes
+        self._results_version = 0
+        if CACHING_AVAILABLE:
+            self.cache = Cache(self.app, config={'CACHE_TYPE': 'SimpleCache',
+                                                 'CACHE_DEFAULT_TIMEOUT': 5})
+            self.get_dashboard_stats = self.cache.memoize(timeout=5)(self.get_dashboard_stats)
+            self.get_available_sessions = self.cache.memoize(timeout=10)(self.get_available_sessions)
+            self.get_available_domains = self.cache.memoize(timeout=10)(self.get_available_domains)
+        
+        self._count_stmts, self._page_stmts = self._build_result_statements()
+        
+        # Idle read connections shared by requests (each request checks one
+        # out and returns it on teardown); long-lived background threads
+        # such as the progress emitter keep their own in _local
+        self._conn_pool: Queue = Queue(maxsize=os.cpu_count() or 4)
+        self._local = threading.local()
+        
         # Active crawlers management
         self.active_crawls = {}
         self.crawl_threads = {}
+        # Bounded pool of reusable threads for background crawls
+        self.executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='web-crawl')
+        # Separate small pool so exports never wait behind running crawls
+        self.export_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='web-export')
+        self._install_signal_handlers()
+        self._state_lock = threading.Lock()
+        # Crawls with progress waiting to be pushed by the emitter thread,
+        # which is started on first use and keeps one SQLite connection
+        self._pending_emits = set()
+        self._emit_wakeup = threading.Event()
+        self._emitter = None
+        # Background JSON/HTML export jobs, keyed by job id
+        self.export_jobs = {}
         
         # Database path
         self.db_path = os.path.join('downloaded_pages', 'crawler_data.db')
         
-        # Initialize search database
+        # Initialize search database; this also adds and backfills the
+        # pages.domain column on databases written by older crawlers
         self.search_db = None
         if os.path.exists(self.db_path):
             try:
@@ -55,6 +232,35 @@ class CrawlerWebUI:
             except Exception as e:
                 print(f"Warning: Could not initialize search functionality: {e}")
         
+        # Index the dashboard aggregates read (status + size) so they scan
+        # the index instead of the page rows, and the results browser's
+        # filters so each page is an index seek in id order. The crawler's
+        # idx_pages_domain(session_id, domain) already covers both filters,
+        # since SQLite indexes end with the rowid.
+        if os.path.exists(self.db_path):
+            conn = self._checkout_conn()
+            try:
+                # pages.session_id is only added by the crawler; until then the
+                # session filter has nothing to match, but the column must exist
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(pages)")}
+                if 'session_id' not in columns:
+                    conn.execute("ALTER TABLE pages ADD COLUMN session_id INTEGER")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_status_length ON pages(status_code, content_length)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_domain_id ON pages(domain, id)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_session_id ON pages(session_id, id)")
+                # Give the planner statistics for them if nothing has yet
+                analyzed = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+                ).fetchone() and conn.execute(
+                    "SELECT 1 FROM sqlite_stat1 WHERE idx = 'idx_pages_session_id'"
+                ).fetchone()
+                if not analyzed:
+                    conn.execute("ANALYZE pages")
+            except sqlite3.Error as e:
+                print(f"Warning: Could not create dashboard indexes: {e}")
+            finally:
+                self._release_conn(conn)
+        
         self.setup_routes()
         if SOCKETIO_AVAILABLE:
             self.setup_socketio()
@@ -62,6 +268,13 @@ class CrawlerWebUI:
     def setup_routes(self):
         """Setup Flask routes"""
         
+        @self.app.teardown_appcontext
+        def release_db_conn(exc):
+            """Hand the request's SQLite connection back to the pool"""
+            conn = g.pop('db_conn', None)
+            if conn is not None:
+                self._release_conn(conn)
+        
         @self.app.route('/')
         def dashboard():
             """Main dashboard"""
@@ -74,9 +287,9 @@ class CrawlerWebUI:
             """Start a new crawl"""
             try:
                 url = request.form.get('url', '').strip()
-                max_pages = int(request.form.get('max_pages', 100))
-                workers = int(request.form.get('workers', 3))
-                delay = float(request.form.get('delay', 1.0))
+                max_pages = _clamp(request.form.get('max_pages'), 1, 100000, 100)
+                workers = _clamp(request.form.get('workers'), 1, 32, 3)
+                delay = _clamp(request.form.get('delay'), 0.0, 60.0, 1.0)
                 
                 if not url:
                     flash('URL is required', 'error')
@@ -85,15 +298,23 @@ class CrawlerWebUI:
                 # Generate crawl ID
                 crawl_id = f"web_crawl_{int(time.time())}"
                 
-                # Start crawler in background thread
-                thread = threading.Thread(
-                    target=self.run_crawl_background,
-                    args=(crawl_id, url, max_pages, workers, delay)
-                )
-                thread.daemon = True
-                thread.start()
+                # Track the crawl before it is queued, so the monitor and stop
+                # routes find it even while it waits for a free pool thread
+                with self._state_lock:
+                    self.active_crawls[crawl_id] = CrawlState(
+                        url=url,
+                        max_pages=max_pages,
+                        workers=workers,
+                        delay=delay,
+                        start_time=time.time(),
+                        status='queued'
+                    )
                 
-                self.crawl_threads[crawl_id] = thread
+                # Start crawler on a pooled background thread
+                future = self.executor.submit(
+                    self.run_crawl_background, crawl_id, url, max_pages, workers, delay
+                )
+                self.crawl_threads[crawl_id] = future
                 
                 flash(f'Crawl started: {url}', 'success')
                 return redirect(url_for('monitor', crawl_id=crawl_id))
@@ -115,21 +336,28 @@ class CrawlerWebUI:
         @self.app.route('/stop_crawl/<crawl_id>', methods=['POST'])
         def stop_crawl(crawl_id):
             """Stop an active crawl"""
-            if crawl_id in self.active_crawls:
-                self.active_crawls[crawl_id]['status'] = 'stopping'
-                # The crawler will check this status and stop
+            future = self.crawl_threads.get(crawl_id)
+            if crawl_id in self.active_crawls and not (future and future.done()):
+                self.active_crawls[crawl_id].status = 'stopping'
+                # The crawler will check this status and stop; status changes
+                # are pushed right away rather than waiting for the next tick
+                self._emit_progress(crawl_id)
                 flash('Crawl stopping...', 'info')
             return redirect(url_for('dashboard'))
         
         @self.app.route('/results')
         def results():
             """Browse crawl results"""
-            page = int(request.args.get('page', 1))
-            per_page = int(request.args.get('per_page', 20))
+            page = _clamp(request.args.get('page'), 1, 1000000, 1)
+            per_page = _clamp(request.args.get('per_page'), 1, 200, 20)
             session_filter = request.args.get('session', '')
             domain_filter = request.args.get('domain', '')
+            export_job = request.args.get('export_job', '')
+            after = request.args.get('after', type=int)
+            before = request.args.get('before', type=int)
             
-            results = self.get_paginated_results(page, per_page, session_filter, domain_filter)
+            results = self.get_paginated_results(page, per_page, session_filter, domain_filter,
+                                                 after, before)
             sessions = self.get_available_sessions()
             domains = self.get_available_domains()
             
@@ -139,7 +367,8 @@ class CrawlerWebUI:
                                  domains=domains,
                                  current_page=page,
                                  session_filter=session_filter,
-                                 domain_filter=domain_filter)
+                                 domain_filter=domain_filter,
+                                 export_job=export_job)
         
         @self.app.route('/export_data', methods=['POST'])
         def export_data():
@@ -149,42 +378,80 @@ class CrawlerWebUI:
                 session_filter = request.form.get('session', '')
                 include_stats = request.form.get('include_stats') == 'on'
                 
+                from data_exporter import DataExporter
                 exporter = DataExporter(self.db_path)
                 
-                # Generate export
+                # CSV is streamed to the browser as rows are read
                 if format_type == 'csv':
-                    output_file = exporter.export_to_csv(
-                        session_filter=int(session_filter) if session_filter else None,
-                        include_stats=False
+                    rows = exporter.iter_csv_rows(
+                        session_id=int(session_filter) if session_filter else None
+                    )
+                    return Response(
+                        stream_with_context(rows),
+                        mimetype='text/csv',
+                        headers={'Content-Disposition': 'attachment; filename=export.csv'}
                     )
-                elif format_type == 'json':
-                    output_file = exporter.export_to_json(
-                        session_filter=int(session_filter) if session_filter else None,
-                        include_stats=include_stats
+                elif format_type in ('json', 'html'):
+                    # Written to a file in the background; the results page
+                    # polls for it and starts the download when it is ready
+                    job_id = f"export_{int(time.time() * 1000)}"
+                    output_file = os.path.join(os.path.dirname(self.db_path), 'exports',
+                                               f"{job_id}.{format_type}")
+                    self.export_jobs[job_id] = {'status': 'running', 'format': format_type}
+                    self.export_executor.submit(
+                        self.run_export_background, exporter, job_id, format_type,
+                        int(session_filter) if session_filter else None,
+                        include_stats, output_file
                     )
-                elif format_type == 'html':
-                    output_file = exporter.export_to_html()
+                    flash(f'Preparing {format_type.upper()} export, the download will start when it is ready', 'info')
+                    return redirect(url_for('results', export_job=job_id))
                 else:
                     flash('Invalid export format', 'error')
                     return redirect(url_for('results'))
                 
-                flash(f'Export generated: {os.path.basename(output_file)}', 'success')
-                
             except Exception as e:
                 flash(f'Export error: {str(e)}', 'error')
             
             return redirect(url_for('results'))
         
+        @self.app.route('/export_download/<job_id>')
+        def export_download(job_id):
+            """Download a finished background export"""
+            job = self.export_jobs.get(job_id)
+            if job is None or job['status'] != 'completed':
+                flash('Export not found or no longer available', 'error')
+                return redirect(url_for('results'))
+            return send_file(os.path.abspath(job['file']), as_attachment=True)
+        
         @self.app.route('/api/stats')
         def api_stats():
-            """API endpoint for dashboard stats"""
-            return jsonify(self.get_dashboard_stats())
+            """API endpoint for dashboard stats
+            
+            Polls that send back the current ETag get a 304 without the
+            aggregate query running.
+            """
+            etag = self.get_stats_etag()
+            if etag and request.if_none_match.contains(etag):
+                return '', 304
+            response = jsonify(self.get_dashboard_stats())
+            if etag:
+                response.set_etag(etag)
+            return response
+        
+        @self.app.route('/api/export_status/<job_id>')
+        def api_export_status(job_id):
+            """API endpoint for background export status"""
+            job = self.export_jobs.get(job_id)
+            if job is None:
+                return jsonify({'error': 'Export not found'}), 404
+            return jsonify({'status': job['status'], 'format': job['format'],
+                            'error': job.get('error')})
         
         @self.app.route('/api/crawl_status/<crawl_id>')
         def api_crawl_status(crawl_id):
             """API endpoint for crawl status"""
             if crawl_id in self.active_crawls:
-                return jsonify(self.active_crawls[crawl_id])
+                return jsonify(self.active_crawls[crawl_id].to_dict())
             return jsonify({'error': 'Crawl not found'}), 404
         
         # Search Routes
@@ -208,8 +475,18 @@ class CrawlerWebUI:
             
             try:
                 query = request.args.get('q', '').strip()
-                page = int(request.args.get('page', 1))
-                per_page = min(int(request.args.get('per_page', 20)), 100)  # Limit results
+                page = _clamp(request.args.get('page'), 1, 1000000, 1)
+                per_page = _clamp(request.args.get('per_page'), 1, 100, 20)  # Limit results
+                sort = request.args.get('sort', 'relevance')
+                
+                # Keyset cursor ("<sort value>,<page id>") from a previous page
+                cursor = None
+                if request.args.get('cursor'):
+                    try:
+                        key, _, page_id = request.args['cursor'].rpartition(',')
+                        cursor = (float(key), int(page_id))
+                    except ValueError:
+                        cursor = None
                 
                 # Build filters from request
                 filters = {}
@@ -258,20 +535,15 @@ class CrawlerWebUI:
                     query=query,
                     filters=filters,
                     limit=per_page,
-                    offset=offset
+                    offset=offset,
+                    sort=sort,
+                    cursor=cursor
                 )
                 
                 # Format results for display
                 formatted_results = []
+                snippet_pattern = _snippet_pattern(query)
                 for result in search_result['results']:
-                    # Parse extracted data
-                    extracted_data = {}
-                    if result.get('extracted_data'):
-                        try:
-                            extracted_data = json.loads(result['extracted_data'])
-                        except:
-                            pass
-                    
                     formatted_result = {
                         'url': result['url'],
                         'title': result.get('title') or 'No Title',
@@ -281,7 +553,8 @@ class CrawlerWebUI:
                         'timestamp': result.get('timestamp', 0),
                         'response_time': result.get('response_time', 0),
                         'status_code': result.get('status_code', 0),
-                        'snippet': self.get_content_snippet(extracted_data.get('text_content', ''), query),
+                        'snippet': self.get_content_snippet(result.get('content_text') or '', query,
+                                                            pattern=snippet_pattern),
                         'rank': result.get('rank', 0)
                     }
                     formatted_results.append(formatted_result)
@@ -295,7 +568,9 @@ class CrawlerWebUI:
                         'page': page,
                         'per_page': per_page,
                         'has_next': search_result['has_next'],
-                        'has_prev': search_result['has_prev']
+                        'has_prev': search_result['has_prev'],
+                        'next_cursor': ','.join(map(str, search_result['next_cursor']))
+                                       if search_result['next_cursor'] else None
                     })
                 else:
                     return render_template('search_results.html', 
@@ -360,79 +635,263 @@ class CrawlerWebUI:
     def run_crawl_background(self, crawl_id, url, max_pages, workers, delay):
         """Run crawler in background thread"""
         try:
-            # Initialize crawl tracking
-            self.active_crawls[crawl_id] = {
-                'url': url,
-                'max_pages': max_pages,
-                'workers': workers,
-                'delay': delay,
-                'status': 'running',
-                'pages_crawled': 0,
-                'pages_found': 0,
-                'errors': 0,
-                'start_time': time.time(),
-                'current_url': '',
-                'data_size': 0
-            }
+            # The crawl was queued by start_crawl; skip it if it was stopped
+            # (or forgotten) before a pool thread picked it up
+            with self._state_lock:
+                state = self.active_crawls.get(crawl_id)
+                if state is None or state.status != 'queued':
+                    if state is not None:
+                        state.status = 'stopped'
+                        state.end_time = time.time()
+                        self._schedule_forget(crawl_id)
+                    return
+                state.status = 'running'
+                state.start_time = time.time()
             
-            # Create crawler instance
+            # Create crawler instance; pages are committed in batches of
+            # commit_batch rows (or once a second) rather than one at a time
             config = {
                 'max_pages': max_pages,
                 'delay': delay,
-                'workers': workers,
-                'timeout': 30,
+                'max_workers': workers,
                 'user_agent': 'WebCrawler-UI/1.0',
-                'respect_robots': True,
-                'content_types': ['text/html']
+                'commit_batch': 50
             }
             
-            crawler = WebCrawler(config)
+            from crawler import WebCrawler
+            crawler = WebCrawler(**config)
             
             # Custom progress callback
             def progress_callback(stats):
-                if crawl_id in self.active_crawls:
-                    self.active_crawls[crawl_id].update({
-                        'pages_crawled': stats.get('pages_processed', 0),
-                        'pages_found': stats.get('total_found', 0),
-                        'errors': stats.get('errors', 0),
-                        'current_url': stats.get('current_url', ''),
-                        'data_size': stats.get('total_size', 0)
-                    })
-                    
-                    # Emit real-time update
-                    if SOCKETIO_AVAILABLE and self.socketio:
-                        self.socketio.emit('crawl_update', {
-                            'crawl_id': crawl_id,
-                            'data': self.active_crawls[crawl_id]
-                        })
+                state = self.active_crawls.get(crawl_id)
+                if state is None:
+                    return True
+                
+                # Plain attribute stores; readers only ever see whole values
+                state.pages_crawled = stats.get('pages_processed', 0)
+                state.pages_found = stats.get('total_found', 0)
+                state.errors = stats.get('errors', 0)
+                state.current_url = stats.get('current_url', '')
+                state.data_size = stats.get('total_size', 0)
+                
+                self._schedule_progress_emit(crawl_id)
                 
                 # Check if we should stop
-                return self.active_crawls.get(crawl_id, {}).get('status') != 'stopping'
+                return state.status != 'stopping'
             
             # Start crawling
             crawler.crawl(url, progress_callback=progress_callback)
             
             # Mark as completed
             if crawl_id in self.active_crawls:
-                self.active_crawls[crawl_id]['status'] = 'completed'
-                self.active_crawls[crawl_id]['end_time'] = time.time()
+                state = self.active_crawls[crawl_id]
+                state.status = 'completed'
+                state.end_time = time.time()
+                self._invalidate_totals()
                 
                 # Final update
                 self.socketio.emit('crawl_complete', {
                     'crawl_id': crawl_id,
-                    'data': self.active_crawls[crawl_id]
+                    'data': state.to_dict()
                 }) if SOCKETIO_AVAILABLE and self.socketio else None
+                self._schedule_forget(crawl_id)
         
         except Exception as e:
             print(f"Crawl error: {e}")
             if crawl_id in self.active_crawls:
-                self.active_crawls[crawl_id]['status'] = 'error'
-                self.active_crawls[crawl_id]['error'] = str(e)
+                self.active_crawls[crawl_id].status = 'error'
+                self.active_crawls[crawl_id].error = str(e)
                 
                 self.socketio.emit('crawl_error', {
                     'crawl_id': crawl_id,
                     'error': str(e)
                 }) if SOCKETIO_AVAILABLE and self.socketio else None
+                self._schedule_forget(crawl_id)
+    
+    def _build_result_statements(self):
+        """Precompute the results SQL for every filter combination
+        
+        Keys are sorted tuples of filter names, so each request reuses the
+        same SQL text and hits the connection's statement cache.
+        """
+        names = sorted(self.RESULT_FILTERS)
+        count_stmts, page_stmts = {}, {}
+        for mask in range(1 << len(names)):
+            key = tuple(name for bit, name in enumerate(names) if mask & (1 << bit))
+            if 'after' in key and 'before' in key:
+                continue
+            where = " AND ".join(self.RESULT_FILTERS[name] for name in key)
+            where_clause = f"WHERE {where}" if where else ""
+            # Paging backwards seeks upward from the first id shown
+            order = "ASC" if 'before' in key else "DESC"
+            page_stmts[key] = self.RESULTS_PAGE_SQL.format(where=where_clause, order=order)
+            if 'after' not in key and 'before' not in key:
+                count_stmts[key] = f"SELECT COUNT(*) FROM pages {where_clause}"
+        return count_stmts, page_stmts
+    
+    def _schedule_progress_emit(self, crawl_id):
+        """Coalesce progress callbacks into at most one push per interval per crawl"""
+        with self._state_lock:
+            self._pending_emits.add(crawl_id)
+            self._emit_wakeup.set()
+            if self._emitter is None:
+                self._emitter = threading.Thread(target=self._emit_loop,
+                                                 name='web-progress-emitter', daemon=True)
+                self._emitter.start()
+    
+    def _emit_loop(self):
+        """Emitter thread: push pending progress every PROGRESS_EMIT_INTERVAL
+        
+        Running every emit on this one thread means the dashboard stats
+        query reuses its thread-local connection instead of opening a new
+        one per push.
+        """
+        while True:
+            self._emit_wakeup.wait()
+            time.sleep(self.PROGRESS_EMIT_INTERVAL)
+            with self._state_lock:
+                self._emit_wakeup.clear()
+                pending, self._pending_emits = self._pending_emits, set()
+            for crawl_id in pending:
+                try:
+                    self._emit_progress(crawl_id)
+                except Exception as e:
+                    print(f"Progress emit error: {e}")
+    
+    def _emit_progress(self, crawl_id):
+        """Push a crawl's latest progress and refreshed dashboard stats"""
+        state = self.active_crawls.get(crawl_id)
+        if state is None:
+            return
+        
+        if SOCKETIO_AVAILABLE and self.socketio:
+            self.socketio.emit('crawl_update', {
+                'crawl_id': crawl_id,
+                'data': state.to_dict()
+            })
+        
+        # New pages make the cached stats stale; refresh and push them to
+        # dashboards at most once a second instead of letting every client
+        # poll /api/stats
+        now = time.monotonic()
+        if now - self._last_stats_invalidation >= self.STATS_EMIT_INTERVAL:
+            self._last_stats_invalidation = now
+            if self.cache:
+                self.cache.delete_memoized(self.get_dashboard_stats)
+            if SOCKETIO_AVAILABLE and self.socketio:
+                self.socketio.emit('dashboard_stats', self.get_dashboard_stats())
+    
+    def shutdown(self):
+        """Ask running crawls to stop and release the thread pools without waiting"""
+        for state in list(self.active_crawls.values()):
+            if state.status in ('queued', 'running'):
+                state.status = 'stopping'
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.export_executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _install_signal_handlers(self):
+        """Stop crawls when the process is asked to exit (SIGINT/SIGTERM)
+        
+        An atexit hook runs too late for this: concurrent.futures joins its
+        pool threads first, so exit would wait for every crawl to finish.
+        Any handler already installed (e.g. gunicorn's) still runs after.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            previous = signal.getsignal(signum)
+            
+            def handler(sig, frame, previous=previous):
+                self.shutdown()
+                if callable(previous):
+                    previous(sig, frame)
+                elif previous == signal.SIG_DFL:
+                    signal.signal(sig, signal.SIG_DFL)
+                    signal.raise_signal(sig)
+            
+            signal.signal(signum, handler)
+    
+    def _invalidate_totals(self):
+        """Drop cached page counts once a crawl has finished writing"""
+        self._results_version += 1
+        if self.cache:
+            self.cache.delete_memoized(self.get_dashboard_stats)
+    
+    def run_export_background(self, exporter, job_id, format_type, session_id,
+                              include_stats, output_file):
+        """Write a JSON or HTML export to disk on a pool thread"""
+        job = self.export_jobs[job_id]
+        try:
+            if format_type == 'json':
+                exporter.export_to_json(output_file, include_stats=include_stats,
+                                        session_id=session_id)
+            else:
+                exporter.generate_html_report(output_file, session_id=session_id)
+            job['file'] = output_file
+            job['status'] = 'completed'
+        except Exception as e:
+            print(f"Export error: {e}")
+            job['error'] = str(e)
+            job['status'] = 'error'
+        finally:
+            timer = threading.Timer(self.FINISHED_EXPORT_TTL, self._forget_export,
+                                    args=(job_id, output_file))
+            timer.daemon = True
+            timer.start()
+    
+    def _forget_export(self, job_id, output_file):
+        """Drop a finished export job and delete its file"""
+        self.export_jobs.pop(job_id, None)
+        try:
+            os.remove(output_file)
+        except OSError:
+            pass  # Never written (failed export) or already removed
+    
+    def _schedule_forget(self, crawl_id):
+        """Drop a finished crawl's state and future after FINISHED_CRAWL_TTL"""
+        timer = threading.Timer(self.FINISHED_CRAWL_TTL, self._forget_crawl, args=(crawl_id,))
+        timer.daemon = True
+        timer.start()
+    
+    def _forget_crawl(self, crawl_id):
+        with self._state_lock:
+            self.active_crawls.pop(crawl_id, None)
+            self.crawl_threads.pop(crawl_id, None)
+    
+    def _checkout_conn(self):
+        """Take an idle pooled connection, opening a tuned one if none are idle."""
+        try:
+            return self._conn_pool.get_nowait()
+        except Empty:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                                   cached_statements=256)
+            for pragma in self.CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            return conn
+    
+    def _release_conn(self, conn):
+        """Return a connection to the pool, closing it if the pool is full."""
+        try:
+            self._conn_pool.put_nowait(conn)
+        except Full:
+            conn.close()
+    
+    def _conn(self):
+        """Return the SQLite connection for the current request or thread.
+        
+        Requests run on short-lived threads/greenlets, so they borrow a
+        pooled connection that teardown_appcontext hands back. Outside a
+        request (the progress emitter) the thread keeps its own.
+        """
+        if has_app_context():
+            conn = g.get('db_conn')
+            if conn is None:
+                conn = g.db_conn = self._checkout_conn()
+            return conn
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._checkout_conn()
+        return conn
     
     def get_dashboard_stats(self):
         """Get dashboard statistics"""
@@ -447,36 +906,25 @@ class CrawlerWebUI:
                     'data_size': 0
                 }
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Total pages
-            cursor.execute("SELECT COUNT(*) FROM pages")
-            total_pages = cursor.fetchone()[0]
+            cursor = self._conn().cursor()
             
-            # Success rate
-            cursor.execute("SELECT COUNT(*) FROM pages WHERE status_code BETWEEN 200 AND 299")
-            successful = cursor.fetchone()[0]
+            # All page aggregates in one pass (over the covering
+            # idx_pages_status_length index) plus the session count
+            cursor.execute("""
+                SELECT
+                    COUNT(*),
+                    COALESCE(SUM(status_code BETWEEN 200 AND 299), 0),
+                    COALESCE(SUM(status_code >= 400), 0),
+                    (SELECT COUNT(*) FROM crawl_sessions),
+                    COALESCE(SUM(content_length), 0)
+                FROM pages
+            """)
+            total_pages, successful, total_errors, total_sessions, data_size = cursor.fetchone()
             success_rate = (successful / total_pages * 100) if total_pages > 0 else 0
             
-            # Total errors
-            cursor.execute("SELECT COUNT(*) FROM pages WHERE status_code >= 400")
-            total_errors = cursor.fetchone()[0]
-            
-            # Total sessions
-            cursor.execute("SELECT COUNT(DISTINCT id) FROM crawl_sessions")
-            total_sessions = cursor.fetchone()[0]
-            
-            # Data size
-            cursor.execute("SELECT SUM(content_length) FROM pages WHERE content_length IS NOT NULL")
-            result = cursor.fetchone()[0]
-            data_size = result if result else 0
-            
-            conn.close()
-            
             return {
                 'total_pages': total_pages,
-                'active_crawls': len([c for c in self.active_crawls.values() if c['status'] == 'running']),
+                'active_crawls': sum(1 for c in self.active_crawls.values() if c.status == 'running'),
                 'success_rate': round(success_rate, 1),
                 'total_errors': total_errors,
                 'total_sessions': total_sessions,
@@ -494,14 +942,31 @@ class CrawlerWebUI:
                 'data_size': 0
             }
     
+    def get_stats_etag(self):
+        """Cheap version tag for the dashboard stats"""
+        # Newest page and session ids are rowid lookups, not scans
+        try:
+            if not os.path.exists(self.db_path):
+                return None
+            max_page, max_session = self._conn().execute("""
+                SELECT (SELECT COALESCE(MAX(id), 0) FROM pages),
+                       (SELECT COALESCE(MAX(id), 0) FROM crawl_sessions)
+            """).fetchone()
+            running = sum(1 for c in self.active_crawls.values() if c.status == 'running')
+            return f"{max_page}-{max_session}-{running}"
+        except sqlite3.Error as e:
+            print(f"Stats ETag error: {e}")
+            return None
+    
     def get_recent_crawls(self):
         """Get recent crawl sessions"""
         try:
             if not os.path.exists(self.db_path):
                 return []
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self._conn().cursor()
+            # Column aliases match the dict keys the dashboard expects
+            cursor.row_factory = sqlite3.Row
             
             cursor.execute("""
                 SELECT 
@@ -517,104 +982,92 @@ class CrawlerWebUI:
             """)
             
             crawls = []
-            for row in cursor.fetchall():
-                session_id, start_time, end_time, page_count, error_count, domains = row
-                
-                status = 'completed'
-                if session_id in [c for c in self.active_crawls.keys()]:
-                    status = self.active_crawls[session_id]['status']
+            active = self.active_crawls
+            for row in cursor:
+                crawl = dict(row)
+                crawl['error_count'] = crawl['error_count'] or 0
                 
-                crawls.append({
-                    'session_id': session_id,
-                    'start_time': start_time,
-                    'end_time': end_time,
-                    'page_count': page_count,
-                    'error_count': error_count or 0,
-                    'domains': domains,
-                    'status': status
-                })
+                session_id = crawl['session_id']
+                crawl['status'] = active[session_id].status if session_id in active else 'completed'
+                crawls.append(crawl)
             
-            conn.close()
             return crawls
             
         except Exception as e:
             print(f"Recent crawls error: {e}")
             return []
     
-    def get_paginated_results(self, page, per_page, session_filter='', domain_filter=''):
-        """Get paginated crawl results"""
+    def get_paginated_results(self, page, per_page, session_filter='', domain_filter='',
+                              after=None, before=None):
+        """Get paginated crawl results
+        
+        With after (the last page id shown) the next page is read by seeking
+        below that id instead of skipping OFFSET rows; before (the first id
+        shown) reads the previous page by seeking above it. One row past the
+        page is fetched to tell whether there is more in that direction, so
+        has_next/has_prev do not depend on the page number in the URL.
+        """
         try:
             if not os.path.exists(self.db_path):
                 return {'pages': [], 'total': 0, 'has_next': False, 'has_prev': False}
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Build query with filters
-            where_conditions = []
-            params = []
+            cursor = self._conn().cursor()
             
+            # Pick the prepared statement for this filter combination; params
+            # follow the sorted filter names
+            filters = {}
             if session_filter:
-                where_conditions.append("session_id = ?")
-                params.append(session_filter)
-            
+                filters['session'] = session_filter
             if domain_filter:
-                where_conditions.append("domain = ?")
-                params.append(domain_filter)
-            
-            where_clause = ""
-            if where_conditions:
-                where_clause = "WHERE " + " AND ".join(where_conditions)
+                filters['domain'] = domain_filter
+            count_key = tuple(sorted(filters))
             
-            # Get total count
-            cursor.execute(f"SELECT COUNT(*) FROM pages {where_clause}", params)
-            total = cursor.fetchone()[0]
+            # Get total count; it only changes as crawls add pages, so keep it
+            # briefly rather than recounting for every page of results
+            cache_key = f"results_total:{self._results_version}:{session_filter}:{domain_filter}"
+            total = self.cache.get(cache_key) if self.cache else None
+            if total is None:
+                cursor.execute(self._count_stmts[count_key],
+                               [filters[name] for name in count_key])
+                total = cursor.fetchone()[0]
+                if self.cache:
+                    self.cache.set(cache_key, total, timeout=30)
             
             # Get paginated results
             offset = (page - 1) * per_page
-            cursor.execute(f"""
-                SELECT id, url, title, status_code, content_length, timestamp,
-                       CASE 
-                           WHEN url LIKE 'http://%' THEN 
-                               CASE 
-                                   WHEN instr(substr(url, 8), '/') = 0 THEN substr(url, 8)
-                                   ELSE substr(url, 8, instr(substr(url, 8), '/') - 1)
-                               END
-                           WHEN url LIKE 'https://%' THEN 
-                               CASE 
-                                   WHEN instr(substr(url, 9), '/') = 0 THEN substr(url, 9)
-                                   ELSE substr(url, 9, instr(substr(url, 9), '/') - 1)
-                               END
-                           ELSE url
-                       END as domain,
-                       response_time
-                FROM pages {where_clause}
-                ORDER BY id DESC
-                LIMIT ? OFFSET ?
-            """, params + [per_page, offset])
-            
-            pages = []
-            for row in cursor.fetchall():
-                pages.append({
-                    'id': row[0],
-                    'url': row[1],
-                    'title': row[2] or 'No title',
-                    'status_code': row[3],
-                    'content_length': row[4] or 0,
-                    'crawl_timestamp': row[5],
-                    'domain': row[6],
-                    'response_time': row[7] or 0
-                })
+            if after is not None:
+                filters['after'] = after
+                offset = 0
+            elif before is not None:
+                filters['before'] = before
+                offset = 0
+            key = tuple(sorted(filters))
+            # Column aliases match the dict keys the results template expects
+            cursor.row_factory = sqlite3.Row
+            cursor.arraysize = per_page + 1
+            cursor.execute(self._page_stmts[key],
+                           [filters[name] for name in key] + [per_page + 1, offset])
             
-            conn.close()
+            pages = [dict(row) for row in cursor.fetchmany()]
+            more = len(pages) > per_page
+            del pages[per_page:]
+            if 'before' in filters:
+                # Rows came back oldest-first from the upward seek; a cursor
+                # taken from a shown page means older rows follow it
+                pages.reverse()
+                has_next, has_prev = True, more
+            else:
+                has_next, has_prev = more, 'after' in filters or offset > 0
             
             return {
                 'pages': pages,
                 'total': total,
-                'has_next': (page * per_page) < total,
-                'has_prev': page > 1,
+                'has_next': has_next,
+                'has_prev': has_prev,
                 'page': page,
-                'per_page': per_page
+                'per_page': per_page,
+                'next_after': pages[-1]['id'] if pages else None,
+                'prev_before': pages[0]['id'] if pages else None
             }
             
         except Exception as e:
@@ -627,11 +1080,9 @@ class CrawlerWebUI:
             if not os.path.exists(self.db_path):
                 return []
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self._conn().cursor()
             cursor.execute("SELECT id FROM crawl_sessions ORDER BY id DESC")
             sessions = [row[0] for row in cursor.fetchall()]
-            conn.close()
             return sessions
             
         except Exception as e:
@@ -644,52 +1095,46 @@ class CrawlerWebUI:
             if not os.path.exists(self.db_path):
                 return []
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("""SELECT DISTINCT 
-                CASE 
-                    WHEN url LIKE 'http://%' THEN 
-                        CASE 
-                            WHEN instr(substr(url, 8), '/') = 0 THEN substr(url, 8)
-                            ELSE substr(url, 8, instr(substr(url, 8), '/') - 1)
-                        END
-                    WHEN url LIKE 'https://%' THEN 
-                        CASE 
-                            WHEN instr(substr(url, 9), '/') = 0 THEN substr(url, 9)
-                            ELSE substr(url, 9, instr(substr(url, 9), '/') - 1)
-                        END
-                    ELSE url
-                END as domain 
-                FROM pages 
-                ORDER BY domain""")
+            cursor = self._conn().cursor()
+            # The crawler keeps per-domain counts in pages_domains; databases it
+            # has not migrated yet fall back to an index walk over pages.domain
+            try:
+                cursor.execute("SELECT domain FROM pages_domains ORDER BY domain")
+            except sqlite3.OperationalError:
+                cursor.execute("""
+                    SELECT DISTINCT domain FROM pages
+                    WHERE domain IS NOT NULL AND domain != ''
+                    ORDER BY domain
+                """)
             domains = [row[0] for row in cursor.fetchall()]
-            conn.close()
             return domains
             
         except Exception as e:
             print(f"Domains error: {e}")
             return []
     
-    def get_content_snippet(self, content, query, max_length=200):
-        """Extract a snippet of content highlighting the search query"""
+    def get_content_snippet(self, content, query, max_length=200, pattern=None):
+        """Extract a snippet of content highlighting the search query
+        
+        Callers formatting many results can pass the query's compiled
+        pattern (from _snippet_pattern) to skip looking it up per result.
+        """
         if not content or not query:
             return content[:max_length] + "..." if len(content) > max_length else content
         
-        content_lower = content.lower()
-        query_lower = query.lower()
+        truncated = len(content) > self.SNIPPET_SCAN_LIMIT
+        if truncated:
+            content = content[:self.SNIPPET_SCAN_LIMIT]
         
-        # Find the first occurrence of any query term
-        terms = query_lower.split()
-        best_pos = len(content)
-        
-        for term in terms:
-            pos = content_lower.find(term)
-            if pos != -1 and pos < best_pos:
-                best_pos = pos
-        
-        if best_pos == len(content):
+        # Find the first occurrence of any query term in a single scan; the
+        # pattern is compiled once per query, not per result
+        if pattern is None:
+            pattern = _snippet_pattern(query)
+        match = pattern.search(content) if pattern else None
+        if match is None:
             # No terms found, return beginning
             return content[:max_length] + "..." if len(content) > max_length else content
+        best_pos = match.start()
         
         # Extract snippet around the found term
         start = max(0, best_pos - max_length // 3)
@@ -700,13 +1145,23 @@ class CrawlerWebUI:
         # Add ellipsis if we truncated
         if start > 0:
             snippet = "..." + snippet
-        if end < len(content):
+        if end < len(content) or truncated:
             snippet = snippet + "..."
         
         return snippet
     
-    def run(self, host='127.0.0.1', port=5000, debug=True):
-        """Run the web UI"""
+    def run(self, host='127.0.0.1', port=5000, debug=None):
+        """Run the web UI
+        
+        Debug mode (debugger and reloader) is off unless WEBUI_DEBUG=1.
+        
+        For production, serve it with an eventlet worker instead:
+            gunicorn -k eventlet -w 1 'web_ui:create_app()'
+        behind NGINX (see WEB_UI_GUIDE.md for the proxy config).
+        """
+        if debug is None:
+            debug = os.environ.get('WEBUI_DEBUG') == '1'
+        
         print(f"🕷️  Web Crawler UI starting...")
         print(f"🌐 Open your browser to: http://{host}:{port}")
         print(f"📊 Dashboard, monitoring, and data export available")
@@ -714,10 +1169,18 @@ class CrawlerWebUI:
         print()
         
         if SOCKETIO_AVAILABLE and self.socketio:
-            self.socketio.run(self.app, host=host, port=port, debug=debug, allow_unsafe_werkzeug=True)
+            if ASYNC_MODE:
+                self.socketio.run(self.app, host=host, port=port, debug=debug, use_reloader=debug)
+            else:
+                self.socketio.run(self.app, host=host, port=port, debug=debug, use_reloader=debug,
+                                  allow_unsafe_werkzeug=True)
         else:
             print("⚠️  Running without real-time updates (SocketIO not available)")
-            self.app.run(host=host, port=port, debug=debug)
+            self.app.run(host=host, port=port, debug=debug, use_reloader=debug)
+
+def create_app():
+    """Application factory for WSGI servers such as gunicorn"""
+    return CrawlerWebUI().app
 
 def main():
     """Main entry point"""
@@ -729,6 +1192,9 @@ def main():
         print("\n🛑 Web UI stopped")
     except Exception as e:
         print(f"❌ Error: {e}")
+    finally:
+        # Pool threads are joined at interpreter exit, so let crawls wind down first
+        web_ui.shutdown()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file